@@ -26,7 +26,7 @@ from typing import Dict, List, Optional, Any
 import argparse
 from neo4j import GraphDatabase
 import pandas as pd
-from neo4j_config import Neo4jConfig
+from neo4j_config import Neo4jConfig, get_neo4j_config
 
 # Configure logging
 logging.basicConfig(
@@ -41,7 +41,7 @@ class GTFSImporter:
     def __init__(self, config: Neo4jConfig = None, data_dir: str = None, batch_size: int = None):
         # Load configuration
         if config is None:
-            config = Neo4jConfig()
+            config = get_neo4j_config()
         
         self.config = config
         self.data_dir = Path(data_dir or os.getenv('DATA_DIR', 'data'))
@@ -7,6 +7,7 @@ Supports both local and remote Neo4j instances with authentication.
 
 import os
 import re
+from functools import lru_cache
 from urllib.parse import urlparse, parse_qs
 from typing import Dict, Optional, Tuple
 from dotenv import load_dotenv
@@ -136,6 +137,11 @@ def load_neo4j_config(config_file: str = "config.env") -> Neo4jConfig:
     """Load Neo4j configuration from file"""
     return Neo4jConfig(config_file)
 
+@lru_cache(maxsize=None)
+def get_neo4j_config(config_file: str = "config.env") -> Neo4jConfig:
+    """Get a shared Neo4j configuration, parsing the environment only once per file"""
+    return Neo4jConfig(config_file)
+
 # Example usage
 if __name__ == "__main__":
     config = load_neo4j_config()
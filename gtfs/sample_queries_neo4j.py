@@ -5,17 +5,16 @@ Sample Queries for GTFS Data in Neo4j
 This script demonstrates various Cypher queries you can run against the imported GTFS data.
 """
 
-import json
 from typing import Dict, Any, List
 from neo4j import GraphDatabase
-from neo4j_config import Neo4jConfig
+from neo4j_config import Neo4jConfig, get_neo4j_config
 
 class GTFSQueryClient:
     """Client for querying GTFS data in Neo4j using Cypher"""
     
     def __init__(self, config: Neo4jConfig = None):
         if config is None:
-            config = Neo4jConfig()
+            config = get_neo4j_config()
         
         self.config = config
         # Create Neo4j driver
@@ -136,14 +135,39 @@ class GTFSQueryClient:
         return self.query_stops_in_area(min_lat, max_lat, min_lon, max_lon)
     
     def query_stops_in_polygon(self, coordinates: list) -> List[Dict[str, Any]]:
-        """Query stops within a polygon area"""
-        # For now, use a simple bounding box approach
-        lons = [coord[0] for coord in coordinates]
-        lats = [coord[1] for coord in coordinates]
-        min_lon, max_lon = min(lons), max(lons)
-        min_lat, max_lat = min(lats), max(lats)
+        """Query stops within a polygon area given as [lon, lat] pairs"""
+        # Bounding box pre-filter uses the stop_location index; the exact
+        # ray-casting containment test then runs server-side on the survivors
+        polygon = [[float(coord[0]), float(coord[1])] for coord in coordinates]
+        lons = [coord[0] for coord in polygon]
+        lats = [coord[1] for coord in polygon]
         
-        return self.query_stops_in_area(min_lat, max_lat, min_lon, max_lon)
+        query = """
+        MATCH (s:Stop)
+        WHERE s.stop_lat >= $min_lat AND s.stop_lat <= $max_lat 
+          AND s.stop_lon >= $min_lon AND s.stop_lon <= $max_lon
+        WITH s, reduce(inside = false, i IN range(0, size($polygon) - 1) |
+            CASE
+                WHEN ($polygon[i][1] > s.stop_lat) <> ($polygon[i - 1][1] > s.stop_lat)
+                THEN CASE
+                    WHEN s.stop_lon < ($polygon[i - 1][0] - $polygon[i][0]) * (s.stop_lat - $polygon[i][1])
+                                      / ($polygon[i - 1][1] - $polygon[i][1]) + $polygon[i][0]
+                    THEN NOT inside
+                    ELSE inside
+                END
+                ELSE inside
+            END) AS inside
+        WHERE inside
+        RETURN s.stop_id, s.stop_name, s.stop_lat, s.stop_lon, s.stop_code
+        ORDER BY s.stop_name
+        """
+        return self.run_query(query, {
+            "min_lat": min(lats),
+            "max_lat": max(lats),
+            "min_lon": min(lons),
+            "max_lon": max(lons),
+            "polygon": polygon
+        })
     
     def query_route_with_stops(self, route_id: str) -> List[Dict[str, Any]]:
         """Query a route with all its stops"""
@@ -195,7 +219,7 @@ def print_results(title: str, results: List[Dict[str, Any]]):
     
     # Print the first few results
     for i, result in enumerate(results[:3]):  # Show first 3 results
-        print(f"  {i+1}. {json.dumps(result, indent=2, default=str)}")
+        print(f"  {i+1}. " + "\n     ".join(f"{key}: {value}" for key, value in result.items()))
     
     if len(results) > 3:
         print(f"  ... and {len(results) - 3} more results")
@@ -210,7 +234,7 @@ def main():
     client = None
     try:
         # Load configuration
-        config = Neo4jConfig()
+        config = get_neo4j_config()
         config.print_config()
         
         if not config.validate_connection():
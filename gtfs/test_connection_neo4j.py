@@ -4,7 +4,7 @@ Simple test script to verify Neo4j connection
 """
 
 from neo4j import GraphDatabase
-from neo4j_config import Neo4jConfig
+from neo4j_config import get_neo4j_config
 
 def main():
     print("🔧 Testing Neo4j Connection...")
@@ -12,7 +12,7 @@ def main():
     driver = None
     try:
         # Load configuration
-        config = Neo4jConfig()
+        config = get_neo4j_config()
         config.print_config()
         
         # Create Neo4j driver
@@ -6,95 +6,339 @@ text generation, and other AI operations.
 """
 
 import os
-import json
+import time
+import atexit
+import random
+from functools import lru_cache
 from typing import List, Dict, Any, Optional, Union
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
+import fast_json
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    import httpx
+    import h2  # noqa: F401 - required for httpx HTTP/2 support
+except ImportError:
+    httpx = None
+from embedding_cache import get_embedding_cache
+from semantic_cache import SemanticCache
 
 # Load environment variables
 load_dotenv()
 
+# Request headers for JSON bodies serialized by fast_json
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Multiplex requests to cloud providers over HTTP/2 (requires pip install ".[http2]")
+HTTP2_ENABLED = os.getenv('AI_HTTP2', 'false').lower() == 'true'
+
+# Keep-alive connections held per provider session; size it to the total number of
+# concurrent requests (in-flight batches x per-batch concurrency) to avoid reconnects
+HTTP_POOL_SIZE = int(os.getenv('AI_HTTP_POOL_SIZE', '32'))
+
+# Maximum number of in-flight embedding requests for providers without a batch endpoint
+DEFAULT_MAX_CONCURRENCY = int(os.getenv('EMBEDDING_CONCURRENCY', '16'))
+
+# Client-side rate limits (0 disables); keep them a little below your account tier
+REQUESTS_PER_MINUTE = int(os.getenv('AI_REQUESTS_PER_MINUTE', '0'))
+TOKENS_PER_MINUTE = int(os.getenv('AI_TOKENS_PER_MINUTE', '0'))
+
+class EmbeddingsNotSupportedError(NotImplementedError, ValueError):
+    """Raised by providers without an embeddings API; a ValueError like the other provider failures"""
+
+
+class TokenBucket:
+    """Thread-safe token bucket that refills continuously up to a per-minute capacity"""
+    
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.refill_rate = per_minute / 60.0
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+    
+    def acquire(self, amount: float = 1):
+        """Block until `amount` tokens are available, then take them"""
+        amount = min(float(amount), self.capacity)
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_rate)
+                self.updated = now
+                
+                if now >= self.paused_until and self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                
+                wait = max(self.paused_until - now, (amount - self.tokens) / self.refill_rate)
+            time.sleep(wait)
+    
+    def pause(self, seconds: float):
+        """Hold back all callers for a while (e.g. when the server sends Retry-After)"""
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+def _estimate_tokens(payload: Dict[str, Any]) -> int:
+    """Roughly estimate the input tokens of a request payload (about 4 characters per token)"""
+    texts = []
+    for key in ('input', 'prompt'):
+        value = payload.get(key)
+        if isinstance(value, str):
+            texts.append(value)
+        elif isinstance(value, list):
+            texts.extend(item for item in value if isinstance(item, str))
+    for message in payload.get('messages', []):
+        if isinstance(message.get('content'), str):
+            texts.append(message['content'])
+    return max(1, sum(len(text) for text in texts) // 4)
+
+# Application-level retries for transient failures (timeouts, dropped connections, 429/5xx)
+RETRY_ATTEMPTS = int(os.getenv('AI_RETRY_ATTEMPTS', '5'))
+RETRY_INITIAL_WAIT = 0.5
+RETRY_MAX_WAIT = 15.0
+TRANSIENT_STATUS_CODES = {429, 500, 502, 503, 504}
+
+def _parse_retry_after(response) -> Optional[float]:
+    """Read a Retry-After header given in seconds, if present"""
+    retry_after = response.headers.get('Retry-After', '') if response is not None else ''
+    try:
+        return max(0.0, float(retry_after))
+    except ValueError:
+        return None
+
+def _retry_delay(error: Exception, attempt: int) -> Optional[float]:
+    """Seconds to wait before retrying after `error`, or None if it is not transient"""
+    response = getattr(error, 'response', None)
+    if isinstance(error, requests.HTTPError) or (httpx is not None and isinstance(error, httpx.HTTPStatusError)):
+        if response is None or response.status_code not in TRANSIENT_STATUS_CODES:
+            return None
+        retry_after = _parse_retry_after(response)
+        if retry_after is not None:
+            return min(retry_after, RETRY_MAX_WAIT)
+    elif not (isinstance(error, (requests.ConnectionError, requests.Timeout))
+              or (httpx is not None and isinstance(error, httpx.TransportError))):
+        return None
+    
+    # Exponential backoff with jitter so concurrent workers don't retry in lockstep
+    return min(RETRY_MAX_WAIT, RETRY_INITIAL_WAIT * 2 ** (attempt - 1)) + random.uniform(0, RETRY_INITIAL_WAIT)
+
+def _map_concurrently(func, items: List[Any], max_concurrency: int) -> List[Any]:
+    """Apply an I/O-bound function to each item using a bounded thread pool, preserving order"""
+    if len(items) <= 1 or max_concurrency <= 1:
+        return [func(item) for item in items]
+    
+    with ThreadPoolExecutor(max_workers=min(max_concurrency, len(items))) as executor:
+        return list(executor.map(func, items))
+
+def _create_session(headers: Optional[Dict[str, str]] = None, http2: bool = False):
+    """
+    Create an HTTP session with a pooled, retrying adapter and static headers
+    
+    With http2=True (and httpx installed) an httpx.Client is returned instead,
+    multiplexing concurrent requests over a single HTTP/2 connection.
+    """
+    if http2 and httpx is not None:
+        transport = httpx.HTTPTransport(
+            http2=True,
+            retries=3,
+            limits=httpx.Limits(max_connections=HTTP_POOL_SIZE * 2, max_keepalive_connections=HTTP_POOL_SIZE)
+        )
+        return httpx.Client(transport=transport, headers=headers, timeout=httpx.Timeout(60.0))
+    
+    session = requests.Session()
+    if headers:
+        session.headers.update(headers)
+    
+    # Status-code retries (429/5xx) are handled with backoff and jitter in AIProvider._post,
+    # so the adapter only retries failed connection attempts
+    retry = Retry(
+        total=3,
+        read=0,
+        status=0,
+        backoff_factor=0.3,
+        allowed_methods=frozenset(['GET', 'POST'])
+    )
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def _wait_for_batch(session, url: str, is_finished, timeout: float,
+                    poll_interval: float = 5.0, max_interval: float = 60.0) -> Dict[str, Any]:
+    """Poll a batch job status URL with exponential backoff until it finishes"""
+    deadline = time.time() + timeout
+    delay = poll_interval
+    while True:
+        response = session.get(url, timeout=30)
+        response.raise_for_status()
+        status = fast_json.loads(response.content)
+        if is_finished(status):
+            return status
+        
+        if time.time() + delay > deadline:
+            raise TimeoutError(f"Batch did not finish within {timeout} seconds")
+        time.sleep(delay)
+        delay = min(delay * 2, max_interval)
+
 class AIProvider(ABC):
     """Abstract base class for AI providers"""
     
+    # Providers are long-lived and hot; fixed slots avoid a per-instance __dict__
+    __slots__ = ()
+    
     @abstractmethod
-    def generate_embedding(self, text: str) -> List[float]:
-        """Generate embeddings for text"""
+    def generate_embedding(self, text: str) -> np.ndarray:
+        """Generate an embedding for text as a float32 vector"""
         pass
     
     @abstractmethod
-    def generate_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
-        """Generate embeddings for a batch of texts"""
+    def generate_embeddings_batch(self, texts: List[str]) -> np.ndarray:
+        """Generate embeddings for a batch of texts as a 2D float32 array (one row per text)"""
         pass
     
     @abstractmethod
     def chat_completion(self, messages: List[Dict[str, str]], model: Optional[str] = None) -> str:
         """Generate chat completion"""
         pass
+    
+    def chat_completion_many(self, messages_list: List[List[Dict[str, str]]], model: Optional[str] = None,
+                             **kwargs) -> List[str]:
+        """Generate chat completions for many conversations, issuing requests concurrently"""
+        return _map_concurrently(lambda messages: self.chat_completion(messages, model),
+                                 messages_list, getattr(self, 'max_concurrency', DEFAULT_MAX_CONCURRENCY))
+    
+    def _post(self, url: str, payload: Dict[str, Any], timeout: float, stream: bool = False):
+        """POST a JSON payload on the provider session, applying rate limits and retries, and return the response"""
+        rpm_limiter = getattr(self, 'rpm_limiter', None)
+        tpm_limiter = getattr(self, 'tpm_limiter', None)
+        body = fast_json.dumps(payload)
+        
+        for attempt in range(1, RETRY_ATTEMPTS + 1):
+            if rpm_limiter:
+                rpm_limiter.acquire()
+            if tpm_limiter:
+                tpm_limiter.acquire(_estimate_tokens(payload))
+            
+            try:
+                if isinstance(self.session, requests.Session):
+                    response = self.session.post(url, data=body, headers=JSON_HEADERS, timeout=timeout, stream=stream)
+                else:
+                    response = self.session.post(url, content=body, headers=JSON_HEADERS, timeout=timeout)
+                
+                if response.status_code == 429 and rpm_limiter:
+                    # Make every thread back off for as long as the server asks
+                    rpm_limiter.pause(_parse_retry_after(response) or 1.0)
+                response.raise_for_status()
+                return response
+            except Exception as e:
+                delay = _retry_delay(e, attempt)
+                if delay is None or attempt == RETRY_ATTEMPTS:
+                    raise
+                time.sleep(delay)
+    
+    def _post_json(self, url: str, payload: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        """POST a JSON payload on the provider session and decode the JSON response"""
+        return fast_json.loads(self._post(url, payload, timeout).content)
+    
+    def close(self):
+        """Release pooled HTTP connections"""
+        session = getattr(self, 'session', None)
+        if session is not None:
+            session.close()
+    
+    def __del__(self):
+        self.close()
 
 class OpenAIProvider(AIProvider):
     """OpenAI API provider implementation"""
     
-    def __init__(self, api_key: Optional[str] = None, base_url: str = "https://api.openai.com/v1"):
+    __slots__ = ("api_key", "base_url", "embeddings_url", "chat_url", "max_concurrency",
+                 "default_embedding_model", "default_chat_model", "_embed_payload_template",
+                 "session", "rpm_limiter", "tpm_limiter")
+    
+    def __init__(self, api_key: Optional[str] = None, base_url: str = "https://api.openai.com/v1",
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY):
         self.api_key = api_key or os.getenv('OPENAI_API_KEY')
         if not self.api_key:
             raise ValueError("OpenAI API key is required. Set OPENAI_API_KEY environment variable.")
         
         self.base_url = base_url
+        self.embeddings_url = f"{base_url}/embeddings"
+        self.chat_url = f"{base_url}/chat/completions"
+        self.max_concurrency = max_concurrency
         self.default_embedding_model = os.getenv('EMBEDDING_MODEL', 'text-embedding-3-small')
         self.default_chat_model = os.getenv('CHAT_MODEL', 'gpt-4o-mini')
+        # Fixed part of every embeddings request body
+        self._embed_payload_template = {"model": self.default_embedding_model}
+        # Content-Type is set per request, since JSON bodies and multipart file uploads differ
+        self.session = _create_session({"Authorization": f"Bearer {self.api_key}"}, http2=HTTP2_ENABLED)
+        self.rpm_limiter = TokenBucket(REQUESTS_PER_MINUTE) if REQUESTS_PER_MINUTE else None
+        self.tpm_limiter = TokenBucket(TOKENS_PER_MINUTE) if TOKENS_PER_MINUTE else None
     
-    def generate_embedding(self, text: str) -> List[float]:
+    def generate_embedding(self, text: str) -> np.ndarray:
         """Generate embedding for a single text using OpenAI"""
-        url = f"{self.base_url}/embeddings"
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        
-        payload = {
-            "model": self.default_embedding_model,
-            "input": text
-        }
+        url = self.embeddings_url
+        payload = {**self._embed_payload_template, "input": text}
         
         try:
-            response = requests.post(url, headers=headers, json=payload, timeout=30)
-            response.raise_for_status()
-            result = response.json()
-            return result['data'][0]['embedding']
+            result = self._post_json(url, payload, timeout=30)
+            return np.asarray(result['data'][0]['embedding'], dtype=np.float32)
         except Exception as e:
             raise ValueError(f"OpenAI embedding generation failed: {str(e)}")
     
-    def generate_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
+    def generate_embeddings_batch(self, texts: List[str]) -> np.ndarray:
         """Generate embeddings for multiple texts using OpenAI"""
-        url = f"{self.base_url}/embeddings"
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        
-        payload = {
-            "model": self.default_embedding_model,
-            "input": texts
-        }
+        url = self.embeddings_url
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        payload = {**self._embed_payload_template, "input": texts}
         
         try:
-            response = requests.post(url, headers=headers, json=payload, timeout=60)
-            response.raise_for_status()
-            result = response.json()
-            return [item['embedding'] for item in result['data']]
+            if ijson is None or not isinstance(self.session, requests.Session):
+                result = self._post_json(url, payload, timeout=60)
+                items = sorted(result['data'], key=lambda item: item['index'])
+                if len(items) != len(texts):
+                    raise ValueError(f"expected {len(texts)} embeddings, got {len(items)}")
+                return np.asarray([item['embedding'] for item in items], dtype=np.float32)
+            
+            # Parse the response incrementally into a preallocated array instead of
+            # holding the raw body and the parsed nested lists in memory at once
+            response = self._post(url, payload, timeout=60, stream=True)
+            try:
+                response.raw.decode_content = True
+                embeddings = None
+                filled = np.zeros(len(texts), dtype=bool)
+                for item in ijson.items(response.raw, 'data.item', use_float=True):
+                    if embeddings is None:
+                        embeddings = np.empty((len(texts), len(item['embedding'])), dtype=np.float32)
+                    embeddings[item['index']] = item['embedding']
+                    filled[item['index']] = True
+            finally:
+                response.close()
+            
+            # Rows the response did not cover would otherwise be uninitialized memory
+            if not filled.all():
+                missing = np.flatnonzero(~filled).tolist()
+                raise ValueError(f"response is missing embeddings for inputs {missing[:10]}")
+            return embeddings
         except Exception as e:
             raise ValueError(f"OpenAI batch embedding generation failed: {str(e)}")
     
     def chat_completion(self, messages: List[Dict[str, str]], model: Optional[str] = None) -> str:
         """Generate chat completion using OpenAI"""
-        url = f"{self.base_url}/chat/completions"
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        
+        url = self.chat_url
         payload = {
             "model": model or self.default_chat_model,
             "messages": messages,
@@ -103,127 +347,233 @@ class OpenAIProvider(AIProvider):
         }
         
         try:
-            response = requests.post(url, headers=headers, json=payload, timeout=60)
-            response.raise_for_status()
-            result = response.json()
+            result = self._post_json(url, payload, timeout=60)
             return result['choices'][0]['message']['content']
         except Exception as e:
             raise ValueError(f"OpenAI chat completion failed: {str(e)}")
+    
+    def chat_completion_many(self, messages_list: List[List[Dict[str, str]]], model: Optional[str] = None,
+                             use_batch_api: bool = False, batch_timeout: float = 86400) -> List[str]:
+        """
+        Generate chat completions for many conversations
+        
+        Args:
+            messages_list: One message list per completion
+            model: Chat model (defaults to CHAT_MODEL)
+            use_batch_api: Submit through the asynchronous Batch API (half price,
+                results within the 24h completion window) instead of concurrent requests
+            batch_timeout: Maximum seconds to wait for a Batch API job
+        
+        Returns:
+            Completions in the same order as messages_list
+        """
+        if not use_batch_api:
+            return super().chat_completion_many(messages_list, model)
+        
+        lines = [
+            fast_json.dumps({
+                "custom_id": str(i),
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": model or self.default_chat_model,
+                    "messages": messages,
+                    "max_tokens": 1000,
+                    "temperature": 0.7
+                }
+            })
+            for i, messages in enumerate(messages_list)
+        ]
+        
+        try:
+            response = self.session.post(
+                f"{self.base_url}/files",
+                data={"purpose": "batch"},
+                files={"file": ("batch.jsonl", b"\n".join(lines), "application/jsonl")},
+                timeout=120
+            )
+            response.raise_for_status()
+            input_file_id = fast_json.loads(response.content)['id']
+            
+            batch_id = self._post_json(f"{self.base_url}/batches", {
+                "input_file_id": input_file_id,
+                "endpoint": "/v1/chat/completions",
+                "completion_window": "24h"
+            }, timeout=60)['id']
+            
+            batch = _wait_for_batch(
+                self.session, f"{self.base_url}/batches/{batch_id}",
+                lambda status: status['status'] in ('completed', 'failed', 'expired', 'cancelled'),
+                batch_timeout
+            )
+            if batch['status'] != 'completed' or not batch.get('output_file_id'):
+                raise ValueError(f"batch {batch_id} ended with status '{batch['status']}'")
+            
+            response = self.session.get(f"{self.base_url}/files/{batch['output_file_id']}/content", timeout=300)
+            response.raise_for_status()
+            
+            results = [None] * len(messages_list)
+            for line in response.content.splitlines():
+                if not line.strip():
+                    continue
+                item = fast_json.loads(line)
+                body = (item.get('response') or {}).get('body') or {}
+                if body.get('choices'):
+                    results[int(item['custom_id'])] = body['choices'][0]['message']['content']
+        except Exception as e:
+            raise ValueError(f"OpenAI batch chat completion failed: {str(e)}")
+        
+        failed = sum(1 for result in results if result is None)
+        if failed:
+            raise ValueError(f"OpenAI batch chat completion failed for {failed} of {len(results)} requests")
+        return results
 
 class AnthropicProvider(AIProvider):
     """Anthropic API provider implementation"""
     
-    def __init__(self, api_key: Optional[str] = None, base_url: str = "https://api.anthropic.com/v1"):
+    __slots__ = ("api_key", "base_url", "messages_url", "max_concurrency",
+                 "default_embedding_model", "default_chat_model",
+                 "session", "rpm_limiter", "tpm_limiter")
+    
+    def __init__(self, api_key: Optional[str] = None, base_url: str = "https://api.anthropic.com/v1",
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY):
         self.api_key = api_key or os.getenv('ANTHROPIC_API_KEY')
         if not self.api_key:
             raise ValueError("Anthropic API key is required. Set ANTHROPIC_API_KEY environment variable.")
         
         self.base_url = base_url
+        self.messages_url = f"{base_url}/messages"
+        self.max_concurrency = max_concurrency
         self.default_embedding_model = "claude-3-sonnet-20240229"
         self.default_chat_model = os.getenv('CHAT_MODEL', 'claude-3-sonnet-20240229')
-    
-    def generate_embedding(self, text: str) -> List[float]:
-        """Generate embedding for a single text using Anthropic"""
-        url = f"{self.base_url}/messages"
-        headers = {
+        self.session = _create_session({
             "x-api-key": self.api_key,
-            "Content-Type": "application/json",
             "anthropic-version": "2023-06-01"
-        }
-        
-        payload = {
-            "model": self.default_embedding_model,
-            "max_tokens": 1,
-            "messages": [{"role": "user", "content": text}]
-        }
-        
-        try:
-            response = requests.post(url, headers=headers, json=payload, timeout=30)
-            response.raise_for_status()
-            result = response.json()
-            # Note: Anthropic doesn't have a direct embeddings API like OpenAI
-            # This is a placeholder - you might need to use a different approach
-            raise NotImplementedError("Anthropic doesn't provide direct embeddings API. Use OpenAI for embeddings.")
-        except Exception as e:
-            raise ValueError(f"Anthropic embedding generation failed: {str(e)}")
+        }, http2=HTTP2_ENABLED)
+        self.rpm_limiter = TokenBucket(REQUESTS_PER_MINUTE) if REQUESTS_PER_MINUTE else None
+        self.tpm_limiter = TokenBucket(TOKENS_PER_MINUTE) if TOKENS_PER_MINUTE else None
     
-    def generate_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
+    def generate_embedding(self, text: str) -> np.ndarray:
+        """Generate embedding for a single text using Anthropic"""
+        # Anthropic doesn't have an embeddings API, so fail before sending a billed request
+        raise EmbeddingsNotSupportedError("Anthropic doesn't provide direct embeddings API. Use OpenAI for embeddings.")
+    
+    def generate_embeddings_batch(self, texts: List[str]) -> np.ndarray:
         """Generate embeddings for multiple texts using Anthropic"""
-        # Anthropic doesn't support batch embeddings
-        embeddings = []
-        for text in texts:
-            embedding = self.generate_embedding(text)
-            embeddings.append(embedding)
-        return embeddings
+        raise EmbeddingsNotSupportedError("Anthropic doesn't provide direct embeddings API. Use OpenAI for embeddings.")
     
     def chat_completion(self, messages: List[Dict[str, str]], model: Optional[str] = None) -> str:
         """Generate chat completion using Anthropic"""
-        url = f"{self.base_url}/messages"
-        headers = {
-            "x-api-key": self.api_key,
-            "Content-Type": "application/json",
-            "anthropic-version": "2023-06-01"
-        }
+        url = self.messages_url
+        payload = self._message_params(messages, model)
         
-        # Convert OpenAI format messages to Anthropic format
-        anthropic_messages = []
-        for msg in messages:
-            if msg['role'] == 'system':
-                # Anthropic uses system prompt differently
-                continue
-            anthropic_messages.append(msg)
+        try:
+            result = self._post_json(url, payload, timeout=60)
+            return result['content'][0]['text']
+        except Exception as e:
+            raise ValueError(f"Anthropic chat completion failed: {str(e)}")
+    
+    def _message_params(self, messages: List[Dict[str, str]], model: Optional[str] = None) -> Dict[str, Any]:
+        """Build Messages API parameters from OpenAI format messages"""
+        # Anthropic uses system prompt differently, so system messages are dropped
+        anthropic_messages = [msg for msg in messages if msg['role'] != 'system']
         
-        payload = {
+        return {
             "model": model or self.default_chat_model,
             "max_tokens": 1000,
             "messages": anthropic_messages
         }
+    
+    def chat_completion_many(self, messages_list: List[List[Dict[str, str]]], model: Optional[str] = None,
+                             use_batch_api: bool = False, batch_timeout: float = 86400) -> List[str]:
+        """
+        Generate chat completions for many conversations
+        
+        Args:
+            messages_list: One message list per completion
+            model: Chat model (defaults to CHAT_MODEL)
+            use_batch_api: Submit through the Message Batches API (half price,
+                asynchronous) instead of concurrent requests
+            batch_timeout: Maximum seconds to wait for a batch
+        
+        Returns:
+            Completions in the same order as messages_list
+        """
+        if not use_batch_api:
+            return super().chat_completion_many(messages_list, model)
         
         try:
-            response = requests.post(url, headers=headers, json=payload, timeout=60)
+            batch_id = self._post_json(f"{self.base_url}/messages/batches", {
+                "requests": [
+                    {"custom_id": str(i), "params": self._message_params(messages, model)}
+                    for i, messages in enumerate(messages_list)
+                ]
+            }, timeout=120)['id']
+            
+            batch = _wait_for_batch(
+                self.session, f"{self.base_url}/messages/batches/{batch_id}",
+                lambda status: status['processing_status'] == 'ended',
+                batch_timeout
+            )
+            
+            response = self.session.get(batch['results_url'], timeout=300)
             response.raise_for_status()
-            result = response.json()
-            return result['content'][0]['text']
+            
+            results = [None] * len(messages_list)
+            for line in response.content.splitlines():
+                if not line.strip():
+                    continue
+                item = fast_json.loads(line)
+                result = item.get('result') or {}
+                if result.get('type') == 'succeeded':
+                    results[int(item['custom_id'])] = result['message']['content'][0]['text']
         except Exception as e:
-            raise ValueError(f"Anthropic chat completion failed: {str(e)}")
+            raise ValueError(f"Anthropic batch chat completion failed: {str(e)}")
+        
+        failed = sum(1 for result in results if result is None)
+        if failed:
+            raise ValueError(f"Anthropic batch chat completion failed for {failed} of {len(results)} requests")
+        return results
 
 class OllamaProvider(AIProvider):
     """Ollama local provider implementation"""
     
-    def __init__(self, host: str = "localhost", port: int = 11434, model: str = "nomic-embed-text"):
+    __slots__ = ("host", "port", "model", "max_concurrency", "base_url", "embeddings_url",
+                 "generate_url", "_embed_payload_template", "session")
+    
+    def __init__(self, host: str = "localhost", port: int = 11434, model: str = "nomic-embed-text",
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY):
         self.host = host
         self.port = port
         self.model = model
+        self.max_concurrency = max_concurrency
         self.base_url = f"http://{host}:{port}"
+        self.embeddings_url = f"{self.base_url}/api/embeddings"
+        self.generate_url = f"{self.base_url}/api/generate"
+        # Fixed part of every embeddings request body
+        self._embed_payload_template = {"model": model}
+        self.session = _create_session()
     
-    def generate_embedding(self, text: str) -> List[float]:
+    def generate_embedding(self, text: str) -> np.ndarray:
         """Generate embedding using local Ollama"""
-        url = f"{self.base_url}/api/embeddings"
-        
-        payload = {
-            "model": self.model,
-            "prompt": text
-        }
+        url = self.embeddings_url
+        payload = {**self._embed_payload_template, "prompt": text}
         
         try:
-            response = requests.post(url, json=payload, timeout=30)
-            response.raise_for_status()
-            result = response.json()
-            return result['embedding']
+            result = self._post_json(url, payload, timeout=30)
+            return np.asarray(result['embedding'], dtype=np.float32)
         except Exception as e:
             raise ValueError(f"Ollama embedding generation failed: {str(e)}")
     
-    def generate_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
+    def generate_embeddings_batch(self, texts: List[str]) -> np.ndarray:
         """Generate embeddings for multiple texts using Ollama"""
-        embeddings = []
-        for text in texts:
-            embedding = self.generate_embedding(text)
-            embeddings.append(embedding)
-        return embeddings
+        # The embeddings endpoint takes one prompt per request, so issue them concurrently
+        return np.asarray(_map_concurrently(self.generate_embedding, texts, self.max_concurrency),
+                          dtype=np.float32)
     
     def chat_completion(self, messages: List[Dict[str, str]], model: Optional[str] = None) -> str:
         """Generate chat completion using Ollama"""
-        url = f"{self.base_url}/api/generate"
+        url = self.generate_url
         
         # Convert messages to Ollama format
         prompt = ""
@@ -242,23 +592,32 @@ class OllamaProvider(AIProvider):
         }
         
         try:
-            response = requests.post(url, json=payload, timeout=60)
-            response.raise_for_status()
-            result = response.json()
+            result = self._post_json(url, payload, timeout=60)
             return result['response']
         except Exception as e:
             raise ValueError(f"Ollama chat completion failed: {str(e)}")
 
+@lru_cache(maxsize=4)
 def get_ai_provider(provider: str = "auto") -> AIProvider:
     """
     Factory function to get the appropriate AI provider
     
+    Providers are cached per provider type, so repeated calls share one
+    instance (and its HTTP connection pool) for the whole process; the pool
+    is closed cleanly at interpreter exit.
+    
     Args:
         provider: Provider type ("openai", "anthropic", "ollama", or "auto")
     
     Returns:
         AIProvider instance
     """
+    ai_provider = _create_provider(provider)
+    atexit.register(ai_provider.close)
+    return ai_provider
+
+def _create_provider(provider: str) -> AIProvider:
+    """Instantiate an AI provider by type"""
     if provider == "openai":
         return OpenAIProvider()
     elif provider == "anthropic":
@@ -284,20 +643,95 @@ def get_ai_provider(provider: str = "auto") -> AIProvider:
         raise ValueError(f"Unknown provider: {provider}")
 
 # Convenience functions
-def get_embeddings(text: str, provider: str = "auto") -> List[float]:
+EMBEDDING_CACHE_ENABLED = os.getenv('EMBEDDING_CACHE', 'true').lower() == 'true'
+
+def _embedding_model_name(ai_provider: AIProvider) -> str:
+    """Identify the embedding model used by a provider, for cache keys"""
+    model = getattr(ai_provider, 'default_embedding_model', None) or getattr(ai_provider, 'model', '')
+    return f"{ai_provider.__class__.__name__}:{model}"
+
+def get_embeddings(text: str, provider: str = "auto") -> np.ndarray:
     """Get embeddings for text using the specified provider"""
-    ai_provider = get_ai_provider(provider)
-    return ai_provider.generate_embedding(text)
+    return get_embeddings_batch([text], provider)[0]
 
-def get_embeddings_batch(texts: List[str], provider: str = "auto") -> List[List[float]]:
-    """Get embeddings for multiple texts using the specified provider"""
+def get_embeddings_batch(texts: List[str], provider: str = "auto", fuzzy: bool = False) -> np.ndarray:
+    """
+    Get embeddings for multiple texts using the specified provider
+    
+    With fuzzy=True, texts that are near-identical to a cached text (for example a
+    headline with a typo fixed) reuse that cached embedding instead of being re-embedded.
+    """
     ai_provider = get_ai_provider(provider)
-    return ai_provider.generate_embeddings_batch(texts)
+    if not EMBEDDING_CACHE_ENABLED:
+        return ai_provider.generate_embeddings_batch(texts)
+    
+    # Only send texts that are not cached yet, then stitch results back in input order
+    cache = get_embedding_cache()
+    model = _embedding_model_name(ai_provider)
+    embeddings = cache.get_many(model, texts)
+    uncached = list(dict.fromkeys(text for text in texts if text not in embeddings))
+    if fuzzy and uncached:
+        embeddings.update(cache.get_similar_many(model, uncached))
+        uncached = [text for text in uncached if text not in embeddings]
+    
+    if uncached:
+        if len(uncached) == 1:
+            generated = [ai_provider.generate_embedding(uncached[0])]
+        else:
+            generated = ai_provider.generate_embeddings_batch(uncached)
+        new_embeddings = dict(zip(uncached, generated))
+        cache.put_many(model, new_embeddings)
+        embeddings.update(new_embeddings)
+    
+    return np.asarray([embeddings[text] for text in texts], dtype=np.float32)
+
+SEMANTIC_CACHE_ENABLED = os.getenv('SEMANTIC_CACHE', 'false').lower() == 'true'
+_semantic_cache = None
 
-def chat_completion(messages: List[Dict[str, str]], provider: str = "auto", model: Optional[str] = None) -> str:
-    """Get chat completion using the specified provider"""
+def get_semantic_cache() -> SemanticCache:
+    """Get the shared semantic cache, embedding prompts with the local Ollama model"""
+    global _semantic_cache
+    if _semantic_cache is None:
+        _semantic_cache = SemanticCache(get_ai_provider("ollama"))
+    return _semantic_cache
+
+def reset_provider_cache():
+    """Forget cached provider instances (e.g. after changing environment variables)"""
+    global _semantic_cache
+    get_ai_provider.cache_clear()
+    _semantic_cache = None
+
+def chat_completion(messages: List[Dict[str, str]], provider: str = "auto", model: Optional[str] = None,
+                    no_cache: bool = False) -> str:
+    """
+    Get chat completion using the specified provider
+    
+    When SEMANTIC_CACHE is enabled, responses to near-duplicate prompts are served
+    from the semantic cache. Pass no_cache=True for prompts that must not be cached.
+    """
     ai_provider = get_ai_provider(provider)
-    return ai_provider.chat_completion(messages, model)
+    if no_cache or not SEMANTIC_CACHE_ENABLED:
+        return ai_provider.chat_completion(messages, model)
+    
+    namespace = f"{os.getenv('SEMANTIC_CACHE_NAMESPACE', 'default')}:{ai_provider.__class__.__name__}:" \
+                f"{model or getattr(ai_provider, 'default_chat_model', '')}"
+    vector = None
+    try:
+        cache = get_semantic_cache()
+        vector = cache.embed(messages)
+        cached = cache.lookup(messages, namespace, vector)
+        if cached is not None:
+            return cached
+    except Exception as e:
+        print(f"⚠️  Semantic cache unavailable: {e}")
+    
+    response = ai_provider.chat_completion(messages, model)
+    if vector is not None:
+        try:
+            cache.store(messages, response, namespace, vector)
+        except Exception as e:
+            print(f"⚠️  Semantic cache unavailable: {e}")
+    return response
 
 if __name__ == "__main__":
     # Test the provider
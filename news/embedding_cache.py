@@ -0,0 +1,261 @@
+"""
+Embedding Cache for News Knowledge Graph
+
+Persists embeddings in a local SQLite database keyed by a hash of the
+embedding model and input text, so identical texts are only sent to the
+AI provider once across runs.
+"""
+
+import os
+import re
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Optional
+import numpy as np
+
+PRECISIONS = ("fp32", "fp16", "int8")
+
+_WORD = re.compile(r"\w+")
+
+def encode_vector(vector: np.ndarray, precision: str = "fp32"):
+    """Encode a vector for storage, returning (bytes, scale)"""
+    vector = np.asarray(vector, dtype=np.float32)
+    if precision == "fp16":
+        return vector.astype(np.float16).tobytes(), None
+    if precision == "int8":
+        # Symmetric per-vector quantization: v ~= q * scale
+        peak = float(np.max(np.abs(vector))) if vector.size else 0.0
+        scale = peak / 127 if peak else 1.0
+        return np.round(vector / scale).astype(np.int8).tobytes(), scale
+    return vector.tobytes(), None
+
+def decode_vector(blob: bytes, precision: Optional[str] = "fp32", scale: Optional[float] = None) -> np.ndarray:
+    """Decode a stored vector back to float32"""
+    if precision == "fp16":
+        return np.frombuffer(blob, dtype=np.float16).astype(np.float32)
+    if precision == "int8":
+        return np.frombuffer(blob, dtype=np.int8).astype(np.float32) * np.float32(scale)
+    return np.frombuffer(blob, dtype=np.float32)
+
+def simhash(text: str, ngram: int = 4) -> int:
+    """64-bit SimHash of a text's character n-grams; small edits flip only a few bits"""
+    normalized = " ".join(_WORD.findall(text.lower()))
+    shingles = [normalized[i:i + ngram] for i in range(max(len(normalized) - ngram + 1, 1))]
+    hashes = np.array(
+        [int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big')
+         for shingle in shingles],
+        dtype='>u8'
+    )
+    # One row of 64 bits per shingle; each bit of the sketch is a majority vote
+    bits = np.unpackbits(hashes.view(np.uint8)).reshape(-1, 64)
+    votes = bits.sum(axis=0) * 2 > len(shingles)
+    return int.from_bytes(np.packbits(votes).tobytes(), 'big')
+
+def _popcount(values: np.ndarray) -> np.ndarray:
+    """Count set bits in each element of a uint64 array"""
+    return np.unpackbits(values.view(np.uint8)).reshape(-1, 64).sum(axis=1)
+
+class EmbeddingCache:
+    """SQLite-backed embedding cache with an in-process LRU layer"""
+
+    def __init__(self, path: Optional[str] = None, memory_size: int = 4096, precision: Optional[str] = None,
+                 fuzzy: Optional[bool] = None):
+        """
+        Open (or create) the cache database
+
+        Args:
+            path: SQLite database path
+            memory_size: Number of embeddings kept in the in-process LRU layer
+            precision: Storage precision for new entries: "fp32", "fp16" (half the size)
+                or "int8" (a quarter of the size, with a per-vector scale factor)
+            fuzzy: Keep SimHash sketches for near-duplicate lookups (EMBEDDING_FUZZY_CACHE by default;
+                also switched on by the first get_similar_many call)
+        """
+        self.path = path or os.getenv('EMBEDDING_CACHE_PATH', '.embedding_cache.sqlite')
+        self.memory_size = memory_size
+        self.precision = precision or os.getenv('EMBEDDING_CACHE_PRECISION', 'fp32')
+        if self.precision not in PRECISIONS:
+            raise ValueError(f"Unknown embedding cache precision: {self.precision}")
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        # WAL lets concurrent generator runs read the cache while another one writes
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vec BLOB, precision TEXT, scale REAL)"
+        )
+        # SimHash sketches for near-duplicate lookups, stored as signed 64-bit integers
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS sketches (key TEXT PRIMARY KEY, model TEXT, simhash INTEGER)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS sketches_model ON sketches (model)")
+        self.fuzzy_distance = int(os.getenv('EMBEDDING_FUZZY_DISTANCE', '6'))
+        if fuzzy is None:
+            fuzzy = os.getenv('EMBEDDING_FUZZY_CACHE', 'false').lower() == 'true'
+        self.fuzzy = fuzzy
+        # Per-model in-memory sketch index: (keys, uint64 sketches, key set)
+        self._sketches = {}
+        # Caches created before precision support only have key and vec (fp32)
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(embeddings)")}
+        if 'precision' not in columns:
+            self.conn.execute("ALTER TABLE embeddings ADD COLUMN precision TEXT")
+            self.conn.execute("ALTER TABLE embeddings ADD COLUMN scale REAL")
+        self.conn.commit()
+
+    @staticmethod
+    def make_key(model: str, text: str) -> str:
+        """Build the cache key for a model/text pair"""
+        return hashlib.sha256(f"{model}\0{text}".encode('utf-8')).hexdigest()
+
+    def _remember(self, key: str, embedding: np.ndarray):
+        """Store an embedding in the in-process LRU layer"""
+        self._memory[key] = embedding
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def get(self, model: str, text: str) -> Optional[np.ndarray]:
+        """Get a cached embedding, or None on a miss"""
+        return self.get_many(model, [text]).get(text)
+
+    def get_many(self, model: str, texts: List[str]) -> Dict[str, np.ndarray]:
+        """Get cached embeddings for several texts, keyed by text (misses are omitted)"""
+        found = {}
+        missing = {}
+
+        with self._lock:
+            for text in texts:
+                key = self.make_key(model, text)
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    found[text] = self._memory[key]
+                else:
+                    missing[key] = text
+
+            if missing:
+                keys = list(missing)
+                # Stay well below SQLite's bound-parameter limit
+                for i in range(0, len(keys), 500):
+                    chunk = keys[i:i + 500]
+                    placeholders = ",".join("?" * len(chunk))
+                    rows = self.conn.execute(
+                        f"SELECT key, vec, precision, scale FROM embeddings WHERE key IN ({placeholders})", chunk
+                    ).fetchall()
+                    for key, blob, precision, scale in rows:
+                        embedding = decode_vector(blob, precision, scale)
+                        self._remember(key, embedding)
+                        found[missing[key]] = embedding
+
+            if self.fuzzy and found:
+                self._backfill_sketches(model, {self.make_key(model, text): text for text in found})
+
+        return found
+
+    def _load_sketches(self, model: str):
+        """Load the sketch index of a model into memory"""
+        if model not in self._sketches:
+            rows = self.conn.execute("SELECT key, simhash FROM sketches WHERE model = ?", (model,)).fetchall()
+            keys = [row[0] for row in rows]
+            self._sketches[model] = (keys, np.array([row[1] for row in rows], dtype=np.int64).view(np.uint64),
+                                     set(keys))
+        return self._sketches[model]
+
+    def _add_sketches(self, model: str, texts: Dict[str, str]):
+        """Compute, store and index the sketches of texts, given as key -> text"""
+        if not texts:
+            return
+        sketch_rows = [(key, model, int(np.uint64(simhash(text)).view(np.int64))) for key, text in texts.items()]
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO sketches (key, model, simhash) VALUES (?, ?, ?)", sketch_rows
+        )
+        self.conn.commit()
+
+        if model in self._sketches:
+            keys, sketches, key_set = self._sketches[model]
+            new_keys = [row[0] for row in sketch_rows if row[0] not in key_set]
+            new_sketches = np.array([row[2] for row in sketch_rows if row[0] not in key_set],
+                                    dtype=np.int64).view(np.uint64)
+            key_set.update(new_keys)
+            self._sketches[model] = (keys + new_keys, np.concatenate([sketches, new_sketches]), key_set)
+
+    def _backfill_sketches(self, model: str, texts: Dict[str, str]):
+        """
+        Sketch cached entries that were stored while fuzzy lookups were off
+
+        The embeddings table only holds hashed keys, so an old entry can only be sketched once its
+        text comes through again (as an exact hit here).
+        """
+        _, _, key_set = self._load_sketches(model)
+        self._add_sketches(model, {key: text for key, text in texts.items() if key not in key_set})
+
+    def get_similar_many(self, model: str, texts: List[str],
+                         max_distance: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Get cached embeddings of near-identical texts (SimHash within max_distance bits), keyed by text"""
+        max_distance = self.fuzzy_distance if max_distance is None else max_distance
+        matches = {}
+
+        with self._lock:
+            # Sketch new entries from now on
+            self.fuzzy = True
+            keys, sketches, _ = self._load_sketches(model)
+            if not keys:
+                return {}
+
+            for text in texts:
+                distances = _popcount(sketches ^ np.uint64(simhash(text)))
+                best = int(np.argmin(distances))
+                if distances[best] <= max_distance:
+                    matches[keys[best]] = text
+
+        found = {}
+        if matches:
+            with self._lock:
+                placeholders = ",".join("?" * len(matches))
+                rows = self.conn.execute(
+                    f"SELECT key, vec, precision, scale FROM embeddings WHERE key IN ({placeholders})", list(matches)
+                ).fetchall()
+            for key, blob, precision, scale in rows:
+                found[matches[key]] = decode_vector(blob, precision, scale)
+        return found
+
+    def put(self, model: str, text: str, embedding: np.ndarray):
+        """Store an embedding in the cache"""
+        self.put_many(model, {text: embedding})
+
+    def put_many(self, model: str, embeddings: Dict[str, np.ndarray]):
+        """Store several embeddings, keyed by text"""
+        rows = []
+        texts = {}
+        with self._lock:
+            for text, embedding in embeddings.items():
+                key = self.make_key(model, text)
+                vector = np.asarray(embedding, dtype=np.float32)
+                self._remember(key, vector)
+                blob, scale = encode_vector(vector, self.precision)
+                rows.append((key, blob, self.precision, scale))
+                texts[key] = text
+
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vec, precision, scale) VALUES (?, ?, ?, ?)", rows
+            )
+            self.conn.commit()
+
+            # SimHash over every shingle is only worth paying for when near-duplicate lookups are used
+            if self.fuzzy:
+                self._add_sketches(model, texts)
+
+    def close(self):
+        """Close the cache database"""
+        self.conn.close()
+
+_cache = None
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Get the shared embedding cache"""
+    global _cache
+    if _cache is None:
+        _cache = EmbeddingCache()
+    return _cache
@@ -0,0 +1,38 @@
+"""
+Fast JSON Helpers for News Knowledge Graph
+
+Uses orjson when it is installed (pip install ".[fast]") and falls back to
+the standard library json module otherwise. dumps always returns bytes.
+"""
+
+import os
+import json
+import mmap
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def dumps(obj, sort_keys: bool = False) -> bytes:
+    """Serialize an object to UTF-8 encoded JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS if sort_keys else 0)
+    return json.dumps(obj, sort_keys=sort_keys, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def loads(data):
+    """Deserialize JSON from bytes or str"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+# Files at least this large are memory-mapped rather than read into a bytes object
+MMAP_MIN_BYTES = 64 * 1024
+
+def load_file(path):
+    """Deserialize a JSON file, memory-mapping large files when orjson can decode them in place"""
+    with open(path, 'rb') as f:
+        if orjson is not None and os.fstat(f.fileno()).st_size >= MMAP_MIN_BYTES:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped, memoryview(mapped) as view:
+                return orjson.loads(view)
+        return loads(f.read())
@@ -0,0 +1,135 @@
+"""
+Geocode Cache for News Knowledge Graph
+
+Persists location coordinates in a local SQLite database keyed by the
+normalized location name, so each place is only geocoded by the AI
+provider once across imports. Optionally it also keeps an embedding per
+location, so a differently spelled name ("NYC" / "New York City") can reuse
+the coordinates of a close enough match.
+"""
+
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, Optional
+import numpy as np
+
+def normalize_location(name: str) -> str:
+    """Build the cache key for a location name"""
+    return " ".join(name.split()).lower()
+
+class GeocodeCache:
+    """SQLite-backed cache of location name -> coordinates"""
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Open (or create) the cache database
+
+        Args:
+            path: SQLite database path
+        """
+        self.path = path or os.getenv('GEOCODE_CACHE_PATH', '.geocode_cache.sqlite')
+        self._lock = threading.Lock()
+        # In-memory similarity index: (unit-length vectors, coordinates), loaded on first use
+        self._vectors = None
+        self._vector_coords = []
+
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        # WAL lets an import and a geocode backfill share the cache
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS locations (key TEXT PRIMARY KEY, latitude REAL, longitude REAL)"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS location_embeddings (key TEXT PRIMARY KEY, embedding BLOB NOT NULL)"
+        )
+        self.conn.commit()
+
+    def get_many(self, names: Iterable[str]) -> Dict[str, Dict[str, float]]:
+        """Get cached coordinates for several location names, keyed by name (misses are omitted)"""
+        keys = {}
+        for name in names:
+            keys.setdefault(normalize_location(name), []).append(name)
+
+        found = {}
+        with self._lock:
+            key_list = list(keys)
+            # Stay well below SQLite's bound-parameter limit
+            for i in range(0, len(key_list), 500):
+                chunk = key_list[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self.conn.execute(
+                    f"SELECT key, latitude, longitude FROM locations WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                for key, latitude, longitude in rows:
+                    for name in keys[key]:
+                        found[name] = {"latitude": latitude, "longitude": longitude}
+
+        return found
+
+    def put_many(self, coordinates: Dict[str, Dict[str, float]]):
+        """Store coordinates for several location names"""
+        rows = [(normalize_location(name), coords["latitude"], coords["longitude"])
+                for name, coords in coordinates.items()]
+        with self._lock:
+            self.conn.executemany("INSERT OR REPLACE INTO locations VALUES (?, ?, ?)", rows)
+            self.conn.commit()
+
+    def _load_vectors(self):
+        """Load the stored location embeddings (with their coordinates) into memory"""
+        if self._vectors is not None:
+            return
+        rows = self.conn.execute(
+            "SELECT e.embedding, l.latitude, l.longitude FROM location_embeddings e JOIN locations l USING (key)"
+        ).fetchall()
+        vectors = [np.frombuffer(row[0], dtype=np.float32) for row in rows]
+        self._vectors = np.vstack(vectors) if vectors else np.empty((0, 0), dtype=np.float32)
+        self._vector_coords = [{"latitude": row[1], "longitude": row[2]} for row in rows]
+
+    @staticmethod
+    def _unit(vector) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def get_similar_many(self, embeddings: Dict[str, np.ndarray], threshold: float) -> Dict[str, Dict[str, float]]:
+        """
+        Get coordinates for location names whose embedding is close to a stored location's
+
+        Args:
+            embeddings: Location name -> embedding
+            threshold: Minimum cosine similarity for a stored location to be reused
+
+        Returns:
+            Coordinates keyed by name (names without a close enough match are omitted)
+        """
+        if not embeddings:
+            return {}
+        names = list(embeddings)
+        queries = np.vstack([self._unit(embeddings[name]) for name in names])
+
+        with self._lock:
+            self._load_vectors()
+            if not len(self._vector_coords) or self._vectors.shape[1] != queries.shape[1]:
+                return {}
+            scores = queries @ self._vectors.T
+            best = scores.argmax(axis=1)
+            return {name: dict(self._vector_coords[index])
+                    for name, index, score in zip(names, best.tolist(), scores.max(axis=1).tolist())
+                    if score >= threshold}
+
+    def put_embeddings(self, embeddings: Dict[str, np.ndarray]):
+        """Store embeddings for location names that already have cached coordinates"""
+        if not embeddings:
+            return
+        vectors = {normalize_location(name): self._unit(vector) for name, vector in embeddings.items()}
+        with self._lock:
+            self.conn.executemany("INSERT OR REPLACE INTO location_embeddings VALUES (?, ?)",
+                                  [(key, vector.tobytes()) for key, vector in vectors.items()])
+            self.conn.commit()
+            # Reload on the next lookup so the new entries (with their coordinates) are included
+            self._vectors = None
+
+    def close(self):
+        """Close the cache database"""
+        self.conn.close()
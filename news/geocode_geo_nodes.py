@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Geocode Geo Nodes in Neo4j News Knowledge Graph
+
+This script backfills coordinates for Geo nodes that were created without a
+location (for example by the optimized importer with --skip-geocoding), using
+the configured AI provider, and writes the results back to Neo4j in batches.
+With --cluster it groups located Geo nodes by distance into Geo.cluster_id.
+"""
+
+import os
+import sys
+import argparse
+from typing import List, Dict, Any, Optional, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from tqdm import tqdm
+from dotenv import load_dotenv
+
+# Add the current directory to the path for imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from neo4j_config import load_neo4j_config
+from ai_provider import get_ai_provider
+from geo_kernels import cluster_locations
+import fast_json
+
+# Load environment variables
+load_dotenv()
+
+class GeoNodeGeocoderNeo4j:
+    """Backfill point locations for Geo nodes in Neo4j"""
+
+    def __init__(self, config_file: str = "config.env"):
+        """Initialize the geocoder"""
+        self.config = load_neo4j_config(config_file)
+        self.driver = self.config.get_driver()
+        self.database = self.config.get_database()
+        self.ai_provider = get_ai_provider()
+
+        # Configuration from environment
+        self.batch_size = int(os.getenv('GEOCODE_BATCH_SIZE', '100'))
+        self.page_size = int(os.getenv('GEOCODE_PAGE_SIZE', '1000'))
+        self.concurrency = int(os.getenv('GEOCODE_CONCURRENCY', '8'))
+        self.cluster_radius_km = float(os.getenv('GEO_CLUSTER_RADIUS_KM', '50'))
+
+        print(f"🌍 Geo node geocoder initialized:")
+        print(f"  AI Provider: {self.ai_provider.__class__.__name__}")
+        print(f"  Batch size: {self.batch_size}")
+        print(f"  Concurrency: {self.concurrency}")
+
+    def count_geo_nodes_without_location(self) -> int:
+        """Count Geo nodes that don't have a location yet"""
+        with self.driver.session(database=self.database) as session:
+            record = session.run("MATCH (g:Geo) WHERE g.location IS NULL RETURN count(g) as count").single()
+            return record['count']
+
+    def iter_geo_nodes_without_location(self, page_size: int = 1000,
+                                        limit: Optional[int] = None) -> Iterator[List[Dict[str, Any]]]:
+        """Yield pages of Geo nodes that don't have a location yet, using keyset pagination on name"""
+        query = """
+        MATCH (g:Geo)
+        WHERE g.location IS NULL AND g.name > $cursor
+        RETURN elementId(g) as id, g.name as name
+        ORDER BY g.name
+        LIMIT $page_size
+        """
+
+        cursor = ""
+        remaining = limit
+        while remaining is None or remaining > 0:
+            size = page_size if remaining is None else min(page_size, remaining)
+            with self.config.get_read_session() as session:
+                result = session.run(query, cursor=cursor, page_size=size)
+                page = [{'id': record['id'], 'name': record['name']} for record in result]
+
+            if not page:
+                return
+
+            yield page
+            cursor = page[-1]['name']
+            if remaining is not None:
+                remaining -= len(page)
+
+    def get_coordinates(self, location: str) -> Optional[Dict[str, float]]:
+        """Geocode a location name to coordinates"""
+        try:
+            prompt = f"Convert this location to coordinates: {location}. Return only JSON with lat and lon as numbers."
+            response = self.ai_provider.chat_completion([
+                {"role": "user", "content": prompt}
+            ])
+
+            coordinates = fast_json.loads(response.strip())
+            if "lat" in coordinates and "lon" in coordinates:
+                return {"latitude": float(coordinates["lat"]), "longitude": float(coordinates["lon"])}
+        except Exception:
+            pass
+
+        return None
+
+    def flush_batch(self, rows: List[Dict[str, Any]], session=None):
+        """Write a batch of geocoded locations in a single transaction, reusing session if given"""
+        if not rows:
+            return
+
+        update_query = """
+        UNWIND $rows as row
+        MATCH (g:Geo)
+        WHERE elementId(g) = row.id
+        SET g.location = point({latitude: row.lat, longitude: row.lon})
+        """
+
+        if session is not None:
+            session.execute_write(lambda tx: tx.run(update_query, rows=rows).consume())
+            return
+
+        with self.driver.session(database=self.database) as session:
+            session.execute_write(lambda tx: tx.run(update_query, rows=rows).consume())
+
+    def geocode_geo_nodes(self, limit: Optional[int] = None):
+        """Geocode all Geo nodes without a location"""
+        print("🔍 Finding Geo nodes without a location...")
+        total = self.count_geo_nodes_without_location()
+        if limit:
+            total = min(total, limit)
+
+        if not total:
+            print("✅ All Geo nodes already have a location!")
+            return
+
+        print(f"📊 Found {total} Geo nodes without a location")
+
+        pending = []
+        total_processed = 0
+        total_successful = 0
+
+        # Geocoding is I/O-bound, so worker threads overlap the provider round-trips.
+        # Writes only happen on this thread, so one session serves every flush.
+        with tqdm(total=total, desc="Geocoding locations") as progress, \
+                ThreadPoolExecutor(max_workers=self.concurrency) as executor, \
+                self.driver.session(database=self.database) as write_session:
+            for page in self.iter_geo_nodes_without_location(self.page_size, limit):
+                results = executor.map(self.get_coordinates, [geo_node['name'] for geo_node in page])
+                for geo_node, coordinates in zip(page, results):
+                    if coordinates:
+                        pending.append({
+                            'id': geo_node['id'],
+                            'lat': coordinates['latitude'],
+                            'lon': coordinates['longitude']
+                        })
+
+                    if len(pending) >= self.batch_size:
+                        self.flush_batch(pending, write_session)
+                        total_successful += len(pending)
+                        pending.clear()
+
+                    progress.update(1)
+                total_processed += len(page)
+
+            if pending:
+                self.flush_batch(pending, write_session)
+                total_successful += len(pending)
+
+        print(f"✅ Processed {total_processed} Geo nodes")
+        print(f"✅ Successfully geocoded {total_successful} locations")
+
+    def cluster_geo_nodes(self, radius_km: Optional[float] = None):
+        """Assign Geo.cluster_id so that located Geo nodes within radius_km hops share a cluster"""
+        radius_km = radius_km or self.cluster_radius_km
+        print(f"🗺️  Clustering Geo nodes within {radius_km} km...")
+
+        with self.config.get_read_session() as session:
+            result = session.run("""
+            MATCH (g:Geo)
+            WHERE g.location IS NOT NULL
+            RETURN elementId(g) as id, g.location.latitude as lat, g.location.longitude as lon
+            """)
+            ids, lats, lons = [], [], []
+            for record in result:
+                ids.append(record['id'])
+                lats.append(record['lat'])
+                lons.append(record['lon'])
+
+        if not ids:
+            print("⚠️  No Geo nodes with a location to cluster")
+            return
+
+        cluster_ids = cluster_locations(lats, lons, radius_km).tolist()
+
+        update_query = """
+        UNWIND $rows as row
+        MATCH (g:Geo)
+        WHERE elementId(g) = row.id
+        SET g.cluster_id = row.cluster_id
+        """
+        with self.driver.session(database=self.database) as session:
+            for i in range(0, len(ids), self.page_size):
+                rows = [{'id': node_id, 'cluster_id': cluster_id}
+                        for node_id, cluster_id in zip(ids[i:i + self.page_size], cluster_ids[i:i + self.page_size])]
+                session.execute_write(lambda tx: tx.run(update_query, rows=rows).consume())
+
+        print(f"✅ Grouped {len(ids)} Geo nodes into {max(cluster_ids) + 1} clusters")
+
+    def check_geo_status(self):
+        """Get statistics about Geo node locations in the database"""
+        # count(g.location) only counts non-null values, so one scan yields both numbers
+        status_query = """
+        MATCH (g:Geo)
+        RETURN count(g) as total, count(g.location) as with_location
+        """
+
+        with self.driver.session(database=self.database) as session:
+            record = session.run(status_query).single()
+
+        total = record['total']
+        with_location = record['with_location']
+        percentage = (with_location / total * 100) if total > 0 else 0
+
+        print(f"📊 Geo Location Statistics:")
+        print(f"  Total Geo nodes: {total}")
+        print(f"  With location: {with_location} ({percentage:.1f}%)")
+        print(f"  Without location: {total - with_location}")
+
+    def close(self):
+        """Close Neo4j connection"""
+        self.config.close()
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description='Geocode Geo nodes in the Neo4j news knowledge graph')
+    parser.add_argument('--config', default='config.env', help='Configuration file path')
+    parser.add_argument('--limit', type=int, help='Maximum number of Geo nodes to geocode')
+    parser.add_argument('--batch-size', type=int, help='Number of locations written per transaction')
+    parser.add_argument('--concurrency', type=int, help='Number of parallel geocoding requests')
+    parser.add_argument('--status', action='store_true', help='Show Geo location statistics only')
+    parser.add_argument('--cluster', action='store_true', help='Group located Geo nodes into distance clusters')
+    parser.add_argument('--radius-km', type=float, help='Clustering radius in km')
+
+    args = parser.parse_args()
+
+    try:
+        # Create geocoder
+        geocoder = GeoNodeGeocoderNeo4j(args.config)
+
+        # Override batch size if specified
+        if args.batch_size:
+            geocoder.batch_size = args.batch_size
+        if args.concurrency:
+            geocoder.concurrency = args.concurrency
+
+        if args.status:
+            # Show statistics only
+            geocoder.check_geo_status()
+        elif args.cluster:
+            geocoder.cluster_geo_nodes(args.radius_km)
+        else:
+            geocoder.geocode_geo_nodes(args.limit)
+            geocoder.check_geo_status()
+
+        # Close connection
+        geocoder.close()
+
+        print("🎉 Geocoding completed!")
+
+    except Exception as e:
+        print(f"❌ Fatal error: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Import Pipeline for News Knowledge Graph
+
+File parsing and batch writing shared by the standard and optimized importers:
+article files are decoded and processed ahead in worker processes (files too large
+to load whole are stream-parsed with ijson, pip install ".[fast]"), and batches are
+written on a pool of threads that each keep one Neo4j session for the whole import.
+"""
+
+import logging
+import multiprocessing
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Callable, Iterator, Iterable, Tuple
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+import fast_json
+
+# Files larger than this are stream-parsed instead of being loaded whole
+STREAM_FILE_BYTES = 10 * 1024 * 1024
+
+log = logging.getLogger('news_import')
+
+def file_articles(data: Any) -> List[Dict[str, Any]]:
+    """Article dicts of a decoded JSON file, whichever feed format it is in"""
+    if isinstance(data, list):
+        return data
+    elif 'response' in data and 'docs' in data['response']:
+        return data['response']['docs']
+    elif 'results' in data:
+        return data['results']
+    return [data]
+
+def load_file_articles(json_file: Path) -> List[Dict[str, Any]]:
+    """Read and decode an article file, returning its article dicts"""
+    return file_articles(fast_json.load_file(json_file))
+
+def stream_file_articles(json_file: Path) -> Iterator[Dict[str, Any]]:
+    """Yield the articles of a large JSON file one at a time, without building the whole document"""
+    with open(json_file, 'rb') as f:
+        if f.read(64).lstrip().startswith(b'['):
+            f.seek(0)
+            yield from ijson.items(f, 'item', use_float=True)
+            return
+
+        # Article Search API archives nest the articles under response.docs, other feeds under results
+        for prefix in ('response.docs.item', 'results.item'):
+            f.seek(0)
+            found = False
+            for article_data in ijson.items(f, prefix, use_float=True):
+                found = True
+                yield article_data
+            if found:
+                return
+
+        # A single article object
+        f.seek(0)
+        yield fast_json.loads(f.read())
+
+def parse_files(json_files: Iterable[Path], parse_file: Callable[[Path], List[Dict[str, Any]]],
+                workers: int) -> Iterator[Tuple[Path, Any]]:
+    """
+    Yield (path, future of the file's processed articles), parsing the next files in worker processes
+
+    Parsing and entity extraction are CPU-bound, so processes rather than threads; parse_file must
+    be a module-level function so it can be sent to them. Files too large to load whole are
+    yielded with None, for the caller to stream with stream_file_articles.
+    """
+    # Spawn rather than fork: the caller already runs writer threads and holds a Neo4j driver,
+    # and forking a multithreaded process can deadlock the children on inherited locks
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+        pending = deque()
+        for json_file in json_files:
+            if ijson is not None and json_file.stat().st_size > STREAM_FILE_BYTES:
+                pending.append((json_file, None))
+            else:
+                pending.append((json_file, pool.submit(parse_file, json_file)))
+            # Keep every worker busy without parsing the whole corpus ahead of the writers
+            if len(pending) > workers * 2:
+                yield pending.popleft()
+        while pending:
+            yield pending.popleft()
+
+class ThreadSessions:
+    """One Neo4j session per calling thread, opened on first use and reused for every later call"""
+
+    def __init__(self, driver, database: str):
+        self.driver = driver
+        self.database = database
+        self._local = threading.local()
+        self._sessions = []
+        self._lock = threading.Lock()
+
+    def get(self):
+        """Session of the calling thread"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self.driver.session(database=self.database)
+            self._local.session = session
+            with self._lock:
+                self._sessions.append(session)
+        return session
+
+    def close(self):
+        """Close every session opened so far"""
+        with self._lock:
+            for session in self._sessions:
+                session.close()
+            self._sessions.clear()
+        self._local = threading.local()
+
+class BatchWriter:
+    """Write batches on worker threads, keeping at most concurrency writes in flight"""
+
+    def __init__(self, write: Callable[[List[Dict[str, Any]]], Any], concurrency: int,
+                 on_written: Optional[Callable[[List[Dict[str, Any]]], Any]] = None):
+        """
+        Args:
+            write: Writes one batch (called on a worker thread)
+            concurrency: Number of writer threads
+            on_written: Called on the submitting thread with each batch written successfully
+        """
+        self.write = write
+        self.concurrency = concurrency
+        self.on_written = on_written
+        self._executor = ThreadPoolExecutor(max_workers=concurrency)
+        self._in_flight = deque()
+
+    def submit(self, batch: List[Dict[str, Any]]):
+        """Queue a batch, waiting for the oldest write while more than concurrency are in flight"""
+        self._in_flight.append((batch, self._executor.submit(self.write, batch)))
+        while len(self._in_flight) > self.concurrency:
+            self._wait(*self._in_flight.popleft())
+
+    def _wait(self, batch: List[Dict[str, Any]], future):
+        """Wait for a submitted write and hand the batch to on_written"""
+        try:
+            future.result()
+        except Exception as e:
+            log.error(f"❌ Error importing batch: {e}")
+            return
+
+        if self.on_written is not None:
+            self.on_written(batch)
+
+    def close(self):
+        """Wait for every write still in flight and stop the worker threads"""
+        while self._in_flight:
+            self._wait(*self._in_flight.popleft())
+        self._executor.shutdown()
@@ -8,13 +8,25 @@ Supports both local and remote Neo4j instances with authentication.
 import os
 import re
 from urllib.parse import urlparse, parse_qs
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 from dotenv import load_dotenv
-from neo4j import GraphDatabase
+from neo4j import GraphDatabase, READ_ACCESS
 
 class Neo4jConfig:
     """Configuration manager for Neo4j connections"""
     
+    # (label, property, name of the plain index older versions created) for the keys the importers
+    # MERGE on; a uniqueness constraint is what makes concurrent MERGEs of one key safe
+    UNIQUE_KEYS = (
+        ('Article', 'uri', 'article_uri'),
+        ('Topic', 'name', 'topic_name'),
+        ('Organization', 'name', 'organization_name'),
+        ('Person', 'name', 'person_name'),
+        ('Author', 'name', 'author_name'),
+        ('Geo', 'name', 'geo_name'),
+        ('Image', 'url', 'image_url'),
+    )
+    
     def __init__(self, config_file: str = "config.env"):
         """Initialize configuration from file"""
         self.config_file = config_file
@@ -22,6 +34,8 @@ class Neo4jConfig:
         self.username = None
         self.password = None
         self.database = None
+        self.pool_size = None
+        self.fetch_size = None
         self.driver = None
         
         # Load configuration
@@ -42,6 +56,8 @@ class Neo4jConfig:
         self.username = os.getenv('NEO4J_USERNAME', 'neo4j')
         self.password = os.getenv('NEO4J_PASSWORD', 'password')
         self.database = os.getenv('NEO4J_DATABASE', 'neo4j')
+        self.pool_size = int(os.getenv('NEO4J_POOL_SIZE', '64'))
+        self.fetch_size = int(os.getenv('NEO4J_FETCH_SIZE', '10000'))
         
         print(f"🔧 Neo4j Configuration:")
         print(f"  URI: {self.uri}")
@@ -54,7 +70,8 @@ class Neo4jConfig:
             self.driver = GraphDatabase.driver(
                 self.uri, 
                 auth=(self.username, self.password),
-                max_connection_pool_size=16,
+                max_connection_pool_size=self.pool_size,
+                connection_acquisition_timeout=60.0,
                 connection_timeout=30.0,
                 max_transaction_retry_time=30.0
             )
@@ -72,6 +89,14 @@ class Neo4jConfig:
     def get_database(self) -> str:
         """Get database name"""
         return self.database
+
+    def get_read_session(self):
+        """
+        Open a session tuned for large result scans: a bigger fetch size (fewer PULL round-trips)
+        and read access, so clusters can route the scan to a secondary instead of the leader
+        """
+        return self.driver.session(database=self.database, fetch_size=self.fetch_size,
+                                   default_access_mode=READ_ACCESS)
     
     def close(self):
         """Close Neo4j driver"""
@@ -90,30 +115,32 @@ class Neo4jConfig:
     
     def create_indexes(self):
         """Create necessary indexes for the news graph"""
+        self.create_constraints()
+        
+        # The merge keys are indexed by their uniqueness constraints
         indexes = [
             # Article indexes
-            "CREATE INDEX article_uri IF NOT EXISTS FOR (a:Article) ON (a.uri)",
             "CREATE INDEX article_title IF NOT EXISTS FOR (a:Article) ON (a.title)",
             "CREATE INDEX article_published IF NOT EXISTS FOR (a:Article) ON (a.published)",
             "CREATE FULLTEXT INDEX article_text IF NOT EXISTS FOR (a:Article) ON EACH [a.title, a.abstract]",
             
-            # Topic indexes
-            "CREATE INDEX topic_name IF NOT EXISTS FOR (t:Topic) ON (t.name)",
-            
-            # Organization indexes
-            "CREATE INDEX organization_name IF NOT EXISTS FOR (o:Organization) ON (o.name)",
-            
-            # Person indexes
-            "CREATE INDEX person_name IF NOT EXISTS FOR (p:Person) ON (p.name)",
-            
-            # Author indexes
-            "CREATE INDEX author_name IF NOT EXISTS FOR (a:Author) ON (a.name)",
-            
             # Geo indexes
-            "CREATE INDEX geo_name IF NOT EXISTS FOR (g:Geo) ON (g.name)",
+            "CREATE POINT INDEX geo_location IF NOT EXISTS FOR (g:Geo) ON (g.location)",
         ]
         
+        def create_all(tx):
+            for index_query in indexes:
+                tx.run(index_query).consume()
+        
         with self.driver.session(database=self.database) as session:
+            try:
+                # Schema-only statements can share one transaction: a single commit round-trip
+                session.execute_write(create_all)
+                print(f"✅ Created/verified {len(indexes)} indexes")
+                return
+            except Exception as e:
+                print(f"⚠️  Batched index creation failed, creating indexes one by one: {e}")
+            
             for index_query in indexes:
                 try:
                     session.run(index_query)
@@ -121,17 +148,58 @@ class Neo4jConfig:
                 except Exception as e:
                     print(f"⚠️  Index creation issue (may already exist): {e}")
     
+    def create_constraints(self):
+        """Create a uniqueness constraint for every merge key (see UNIQUE_KEYS)"""
+        missing = self.missing_unique_constraints()
+        if not missing:
+            print(f"✅ Verified {len(self.UNIQUE_KEYS)} uniqueness constraints")
+            return
+        
+        with self.driver.session(database=self.database) as session:
+            for label, prop, index_name in self.UNIQUE_KEYS:
+                if (label, prop) not in missing:
+                    continue
+                # A plain index on the same property blocks the constraint, which brings its own index
+                session.run(f"DROP INDEX {index_name} IF EXISTS").consume()
+                try:
+                    session.run(
+                        f"CREATE CONSTRAINT {index_name}_unique IF NOT EXISTS "
+                        f"FOR (n:{label}) REQUIRE n.{prop} IS UNIQUE"
+                    ).consume()
+                    print(f"✅ Created uniqueness constraint on {label}.{prop}")
+                except Exception as e:
+                    # Usually duplicate values already in the graph; keep the lookups indexed
+                    print(f"⚠️  Could not create uniqueness constraint on {label}.{prop}: {e}")
+                    session.run(f"CREATE INDEX {index_name} IF NOT EXISTS FOR (n:{label}) ON (n.{prop})").consume()
+    
+    def missing_unique_constraints(self) -> List[Tuple[str, str]]:
+        """(label, property) merge keys that have no uniqueness constraint in the database"""
+        query = """
+        SHOW CONSTRAINTS YIELD type, labelsOrTypes, properties
+        WHERE type IN ['UNIQUENESS', 'NODE_PROPERTY_UNIQUENESS', 'NODE_KEY']
+        RETURN labelsOrTypes, properties
+        """
+        with self.driver.session(database=self.database) as session:
+            constrained = {(record['labelsOrTypes'][0], record['properties'][0])
+                           for record in session.run(query)
+                           if len(record['labelsOrTypes']) == 1 and len(record['properties']) == 1}
+        return [(label, prop) for label, prop, _ in self.UNIQUE_KEYS if (label, prop) not in constrained]
+    
     def create_vector_index(self):
         """Create vector index for embeddings"""
-        vector_index_query = """
+        # Int8-quantized index storage needs Neo4j 5.23+; vectors on the nodes stay float32
+        quantization = os.getenv('NEO4J_VECTOR_QUANTIZATION', 'false').lower() == 'true'
+        quantization_option = ",\n                `vector.quantization.enabled`: true" if quantization else ""
+        
+        vector_index_query = f"""
         CREATE VECTOR INDEX article_embeddings IF NOT EXISTS
         FOR (a:Article) ON (a.embedding)
-        OPTIONS {
-            indexConfig: {
+        OPTIONS {{
+            indexConfig: {{
                 `vector.dimensions`: 1536,
-                `vector.similarity_function`: 'cosine'
-            }
-        }
+                `vector.similarity_function`: 'cosine'{quantization_option}
+            }}
+        }}
         """
         
         with self.driver.session(database=self.database) as session:
@@ -140,6 +208,15 @@ class Neo4jConfig:
                 print("✅ Created/verified vector index for embeddings")
             except Exception as e:
                 print(f"⚠️  Vector index creation issue: {e}")
+    
+    def drop_vector_index(self):
+        """Drop the vector index for embeddings (recreate it with create_vector_index)"""
+        with self.driver.session(database=self.database) as session:
+            try:
+                session.run("DROP INDEX article_embeddings IF EXISTS")
+                print("✅ Dropped vector index for embeddings")
+            except Exception as e:
+                print(f"⚠️  Vector index drop issue: {e}")
 
 def load_neo4j_config(config_file: str = "config.env") -> Neo4jConfig:
     """Load Neo4j configuration"""
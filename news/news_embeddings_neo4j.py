@@ -9,15 +9,27 @@ the database with vector embeddings for semantic search.
 import os
 import sys
 import argparse
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Iterable, Iterator
+from collections import deque
+from itertools import islice
+from operator import itemgetter
+from unicodedata import normalize
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from neo4j import Result, RoutingControl
 from tqdm import tqdm
 from dotenv import load_dotenv
 
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
 # Add the current directory to the path for imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from neo4j_config import load_neo4j_config
-from ai_provider import get_ai_provider
+from ai_provider import get_ai_provider, get_embeddings, get_embeddings_batch
 
 # Load environment variables
 load_dotenv()
@@ -34,102 +46,162 @@ class NewsEmbeddingsGeneratorNeo4j:
         
         # Configuration from environment
         self.batch_size = int(os.getenv('EMBEDDING_BATCH_SIZE', '50'))
+        self.max_inflight = int(os.getenv('EMBEDDING_MAX_INFLIGHT', '5'))
+        self.index_rebuild_threshold = int(os.getenv('EMBEDDING_INDEX_REBUILD_THRESHOLD', '10000'))
+        self.fuzzy_cache = os.getenv('EMBEDDING_FUZZY_CACHE', 'false').lower() == 'true'
+        self.max_tokens = int(os.getenv('EMBEDDING_MAX_TOKENS', '512'))
+        self.encoding = self._load_encoding()
+        self.verbose = False
         
         print(f"🧠 Embeddings generator initialized:")
         print(f"  AI Provider: {self.ai_provider.__class__.__name__}")
         print(f"  Batch size: {self.batch_size}")
+        print(f"  In-flight batches: {self.max_inflight}")
     
-    def get_articles_without_embeddings(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
-        """Get articles that don't have embeddings yet"""
-        query = """
-        MATCH (a:Article)
-        WHERE a.embedding IS NULL
+    # MATCH clauses selecting the articles each mode embeds. The importers label new
+    # articles :PendingEmbedding, so finding work is a label scan instead of a corpus scan
+    MISSING_EMBEDDING_MATCH = """
+        MATCH (a:PendingEmbedding)
+        WHERE a.title IS NOT NULL OR a.abstract IS NOT NULL
+        """
+    TOPIC_MISSING_EMBEDDING_MATCH = """
+        MATCH (a:PendingEmbedding)-[:HAS_TOPIC]->(t:Topic)
+        WHERE toLower(t.name) CONTAINS toLower($topic)
         AND (a.title IS NOT NULL OR a.abstract IS NOT NULL)
-        RETURN a.uri as uri, a.title as title, a.abstract as abstract
+        """
+    UNLABELLED_MISSING_EMBEDDING_MATCH = """
+        MATCH (a:Article)
+        WHERE a.embedding IS NULL AND NOT a:PendingEmbedding
+        """
+    ALL_ARTICLES_MATCH = """
+        MATCH (a:Article)
+        WHERE (a.title IS NOT NULL OR a.abstract IS NOT NULL)
+        """
+    
+    def _read_single(self, query: str, params: Optional[Dict[str, Any]] = None):
+        """Run a one-row read query through the driver-level execute_query API (retried, routed to readers)"""
+        return self.driver.execute_query(query, params or {}, database_=self.database,
+                                         routing_=RoutingControl.READ, result_transformer_=Result.single)
+    
+    def _count_articles(self, match_clause: str, params: Optional[Dict[str, Any]] = None,
+                        limit: Optional[int] = None) -> int:
+        """Count the articles selected by a MATCH clause"""
+        count = self._read_single(match_clause + " RETURN count(a) as count", params)['count']
+        
+        return min(count, limit) if limit else count
+    
+    def _stream_articles(self, match_clause: str, params: Optional[Dict[str, Any]] = None,
+                         limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Stream the articles selected by a MATCH clause, newest first, without building a list
+        
+        Each article is a dict with its uri and the text to embed ("title. abstract", or
+        whichever is present), built server-side so no per-row Python post-processing is needed.
+        """
+        query = match_clause + """
+        WITH a, trim(coalesce(a.title, '')) as title, trim(coalesce(a.abstract, '')) as abstract
         ORDER BY a.published DESC
+        RETURN {
+            uri: a.uri,
+            text: title + CASE WHEN title <> '' AND abstract <> '' THEN '. ' ELSE '' END + abstract
+        } as article
         """
         
         if limit:
             query += f" LIMIT {limit}"
         
+        with self.config.get_read_session() as session:
+            yield from map(itemgetter(0), session.run(query, params or {}))
+    
+    def mark_pending_articles(self) -> int:
+        """Label articles without embeddings as :PendingEmbedding (for graphs imported before the label existed)"""
+        # Commit in chunks so labelling a large corpus does not build one huge transaction;
+        # CALL ... IN TRANSACTIONS needs an auto-commit query, hence session.run
+        mark_query = """
+        MATCH (a:Article)
+        WHERE a.embedding IS NULL AND NOT a:PendingEmbedding
+        CALL {
+            WITH a
+            SET a:PendingEmbedding
+        } IN TRANSACTIONS OF 10000 ROWS
+        RETURN count(a) as count
+        """
+        
         with self.driver.session(database=self.database) as session:
-            result = session.run(query)
-            articles = []
-            
-            for record in result:
-                articles.append({
-                    'uri': record['uri'],
-                    'title': record['title'] or '',
-                    'abstract': record['abstract'] or ''
-                })
-            
-            return articles
+            count = session.run(mark_query).single()['count']
+        
+        print(f"✅ Marked {count} articles as pending embeddings")
+        return count
     
-    def get_articles_with_topic(self, topic: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
-        """Get articles related to a specific topic"""
-        query = """
-        MATCH (a:Article)-[:HAS_TOPIC]->(t:Topic)
-        WHERE toLower(t.name) CONTAINS toLower($topic)
-        AND a.embedding IS NULL
-        AND (a.title IS NOT NULL OR a.abstract IS NOT NULL)
-        RETURN a.uri as uri, a.title as title, a.abstract as abstract
-        ORDER BY a.published DESC
+    def _mark_unlabelled_articles(self) -> int:
         """
+        Label articles that lack both an embedding and the pending label, returning how many
         
-        if limit:
-            query += f" LIMIT {limit}"
+        Graphs imported before the label existed (or Articles created another way) would
+        otherwise look fully embedded.
+        """
+        unlabelled = self._count_articles(self.UNLABELLED_MISSING_EMBEDDING_MATCH)
+        if not unlabelled:
+            return 0
         
-        with self.driver.session(database=self.database) as session:
-            result = session.run(query, {'topic': topic})
-            articles = []
-            
-            for record in result:
-                articles.append({
-                    'uri': record['uri'],
-                    'title': record['title'] or '',
-                    'abstract': record['abstract'] or ''
-                })
-            
-            return articles
+        print(f"⚠️  {unlabelled} articles without embeddings are not labelled :PendingEmbedding, labelling them now")
+        return self.mark_pending_articles()
     
-    def _create_embedding_text(self, article: Dict[str, Any]) -> str:
-        """Create text for embedding generation"""
-        title = article.get('title', '').strip()
-        abstract = article.get('abstract', '').strip()
-        
-        # Combine title and abstract
-        if title and abstract:
-            return f"{title}. {abstract}"
-        elif title:
-            return title
-        elif abstract:
-            return abstract
-        else:
-            return ""
+    def get_articles_without_embeddings(self, limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Stream articles that don't have embeddings yet"""
+        return self._stream_articles(self.MISSING_EMBEDDING_MATCH, limit=limit)
+    
+    def get_articles_with_topic(self, topic: str, limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Stream articles related to a specific topic that don't have embeddings yet"""
+        return self._stream_articles(self.TOPIC_MISSING_EMBEDDING_MATCH, {'topic': topic}, limit)
+    
+    @staticmethod
+    def _load_encoding():
+        """Load the tiktoken encoding of the embedding model, or None if tiktoken is not installed"""
+        if tiktoken is None:
+            return None
+        try:
+            return tiktoken.encoding_for_model(os.getenv('EMBEDDING_MODEL', 'text-embedding-3-small'))
+        except KeyError:
+            # Non-OpenAI models: cl100k_base is a close enough token count
+            return tiktoken.get_encoding('cl100k_base')
+    
+    def _truncate_texts(self, texts: List[str]) -> List[str]:
+        """Cut texts down to max_tokens so no tokens are paid for that the provider would drop"""
+        if not self.max_tokens:
+            return texts
+        if self.encoding is None:
+            # Roughly four characters per token, as in the provider's rate-limit estimate
+            limit = self.max_tokens * 4
+            return [text[:limit] for text in texts]
+        
+        return [
+            self.encoding.decode(ids[:self.max_tokens]) if len(ids) > self.max_tokens else text
+            for text, ids in zip(texts, self.encoding.encode_batch(texts))
+        ]
     
-    def generate_embeddings_batch(self, articles: List[Dict[str, Any]]) -> Dict[str, List[float]]:
+    def generate_embeddings_batch(self, articles: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
         """Generate embeddings for a batch of articles"""
-        # Prepare texts for embedding
-        texts = []
-        uris = []
+        # Prepare texts for embedding (articles with neither a title nor an abstract are skipped)
+        articles = [article for article in articles if article['text']]
+        if not articles:
+            return {}
         
-        for article in articles:
-            text = self._create_embedding_text(article)
-            if text:
-                texts.append(text)
-                uris.append(article['uri'])
+        texts = self._truncate_texts([normalize('NFC', article['text']) for article in articles])
+        pairs = [(article['uri'], text) for article, text in zip(articles, texts)]
         
-        if not texts:
-            return {}
+        # Wire-service abstracts often repeat across sections: embed each distinct text once
+        unique_texts = list(dict.fromkeys(text for _, text in pairs))
         
         try:
-            # Generate embeddings
-            embeddings = self.ai_provider.generate_embeddings_batch(texts)
+            # Generate embeddings (texts already in the embedding cache are not re-sent)
+            embeddings = dict(zip(unique_texts, get_embeddings_batch(unique_texts, fuzzy=self.fuzzy_cache)))
             
             # Create URI to embedding mapping
             embeddings_map = {}
-            for uri, embedding in zip(uris, embeddings):
-                if embedding:  # Only include successful embeddings
+            for uri, text in pairs:
+                embedding = embeddings.get(text)
+                if embedding is not None and len(embedding):  # Only include successful embeddings
                     embeddings_map[uri] = embedding
             
             return embeddings_map
@@ -138,19 +210,17 @@ class NewsEmbeddingsGeneratorNeo4j:
             print(f"❌ Batch embedding generation failed: {e}")
             # Fall back to individual generation
             embeddings_map = {}
-            for article in articles:
+            for uri, text in pairs:
                 try:
-                    text = self._create_embedding_text(article)
-                    if text:
-                        embedding = self.ai_provider.generate_embedding(text)
-                        if embedding:
-                            embeddings_map[article['uri']] = embedding
+                    embedding = get_embeddings(text)
+                    if embedding is not None and len(embedding):
+                        embeddings_map[uri] = embedding
                 except Exception as e:
-                    print(f"⚠️  Failed to generate embedding for {article['uri']}: {e}")
+                    print(f"⚠️  Failed to generate embedding for {uri}: {e}")
             
             return embeddings_map
     
-    def update_embeddings_in_neo4j(self, embeddings_map: Dict[str, List[float]]):
+    def update_embeddings_in_neo4j(self, embeddings_map: Dict[str, np.ndarray]):
         """Update embeddings in Neo4j database"""
         if not embeddings_map:
             return
@@ -158,81 +228,122 @@ class NewsEmbeddingsGeneratorNeo4j:
         update_query = """
         UNWIND $embeddings as embedding
         MATCH (a:Article {uri: embedding.uri})
-        SET a.embedding = embedding.vector
+        CALL db.create.setNodeVectorProperty(a, 'embedding', embedding.vector)
+        REMOVE a:PendingEmbedding
         """
         
-        # Prepare data for batch update
+        # Prepare data for batch update (the driver expects plain lists, sent as a packstream
+        # float list; setNodeVectorProperty stores it as a 32-bit float array, half the size of SET)
         embeddings_data = [
-            {'uri': uri, 'vector': vector} 
+            {'uri': uri, 'vector': vector.tolist()} 
             for uri, vector in embeddings_map.items()
         ]
         
+        # One managed transaction per batch; execute_write retries it on transient errors
         with self.driver.session(database=self.database) as session:
-            session.run(update_query, {'embeddings': embeddings_data})
+            session.execute_write(lambda tx: tx.run(update_query, {'embeddings': embeddings_data}).consume())
         
-        print(f"✅ Updated {len(embeddings_map)} embeddings in Neo4j")
+        # Per-batch confirmations are noise next to the progress bar (and in log collectors)
+        if self.verbose:
+            print(f"✅ Updated {len(embeddings_map)} embeddings in Neo4j")
     
-    def generate_embeddings_for_all(self, limit: Optional[int] = None):
-        """Generate embeddings for all articles without them"""
-        print("🔍 Finding articles without embeddings...")
-        articles = self.get_articles_without_embeddings(limit)
-        
-        if not articles:
-            print("✅ All articles already have embeddings!")
-            return
-        
-        print(f"📊 Found {len(articles)} articles without embeddings")
-        
-        # Process in batches
+    def _iter_batches(self, articles: Iterable[Dict[str, Any]]) -> Iterator[List[Dict[str, Any]]]:
+        """Split a stream of articles into provider batches, reading one window of batches at a time"""
+        articles = iter(articles)
+        window_size = self.batch_size * self.max_inflight
+        while True:
+            window = list(islice(articles, window_size))
+            if not window:
+                return
+            
+            # Group similar-length texts so each provider batch pads to a similar length;
+            # results are keyed by URI, so the original order does not need restoring
+            window.sort(key=lambda article: len(article['text']))
+            for i in range(0, len(window), self.batch_size):
+                yield window[i:i + self.batch_size]
+    
+    def _process_in_batches(self, articles: Iterable[Dict[str, Any]], desc: str, total: int) -> Tuple[int, int]:
+        """Embed articles in batches with several provider requests in flight, returning (processed, successful)"""
         total_processed = 0
         total_successful = 0
+        in_flight = deque()
+        pending_write = None
         
-        for i in tqdm(range(0, len(articles), self.batch_size), desc="Generating embeddings"):
-            batch = articles[i:i + self.batch_size]
-            
-            # Generate embeddings for batch
-            embeddings_map = self.generate_embeddings_batch(batch)
+        def write_oldest():
+            nonlocal total_processed, total_successful, pending_write
+            batch, future = in_flight.popleft()
+            embeddings_map = future.result()
             
-            # Update database
+            # Update database on the writer thread; waiting for the previous write first keeps
+            # at most one write queued and surfaces its errors here
             if embeddings_map:
-                self.update_embeddings_in_neo4j(embeddings_map)
+                if pending_write is not None:
+                    pending_write.result()
+                pending_write = writer.submit(self.update_embeddings_in_neo4j, embeddings_map)
                 total_successful += len(embeddings_map)
             
             total_processed += len(batch)
+            progress.update(len(batch))
+        
+        # Provider calls overlap on worker threads while articles keep streaming in, and each
+        # Neo4j write overlaps with the next batches; at most max_inflight batches are held in memory
+        with ThreadPoolExecutor(max_workers=self.max_inflight) as executor, \
+                ThreadPoolExecutor(max_workers=1) as writer, \
+                tqdm(total=total, desc=desc, disable=None) as progress:
+            for batch in self._iter_batches(articles):
+                in_flight.append((batch, executor.submit(self.generate_embeddings_batch, batch)))
+                if len(in_flight) >= self.max_inflight:
+                    write_oldest()
+            
+            while in_flight:
+                write_oldest()
+            
+            if pending_write is not None:
+                pending_write.result()
         
-        print(f"✅ Processed {total_processed} articles")
-        print(f"✅ Successfully generated {total_successful} embeddings")
+        return total_processed, total_successful
+    
+    def generate_embeddings_for_all(self, limit: Optional[int] = None):
+        """Generate embeddings for all articles without them"""
+        print("🔍 Finding articles without embeddings...")
+        total = self._count_articles(self.MISSING_EMBEDDING_MATCH, limit=limit)
+        if not total and self._mark_unlabelled_articles():
+            total = self._count_articles(self.MISSING_EMBEDDING_MATCH, limit=limit)
         
-        # Update vector index
-        self._update_vector_index()
+        if not total:
+            print("✅ All articles already have embeddings!")
+            return
+        
+        print(f"📊 Found {total} articles without embeddings")
+        self._prepare_vector_index(total)
+        
+        try:
+            # Process in batches
+            total_processed, total_successful = self._process_in_batches(
+                self.get_articles_without_embeddings(limit), "Generating embeddings", total)
+            
+            print(f"✅ Processed {total_processed} articles")
+            print(f"✅ Successfully generated {total_successful} embeddings")
+        finally:
+            # Rebuild the index even if the run fails or is interrupted, so vector search keeps working
+            self._update_vector_index()
     
     def generate_embeddings_for_topic(self, topic: str, limit: Optional[int] = None):
         """Generate embeddings for articles related to a specific topic"""
         print(f"🔍 Finding articles about '{topic}' without embeddings...")
-        articles = self.get_articles_with_topic(topic, limit)
+        total = self._count_articles(self.TOPIC_MISSING_EMBEDDING_MATCH, {'topic': topic}, limit)
+        if not total and self._mark_unlabelled_articles():
+            total = self._count_articles(self.TOPIC_MISSING_EMBEDDING_MATCH, {'topic': topic}, limit)
         
-        if not articles:
+        if not total:
             print(f"✅ No articles about '{topic}' need embeddings!")
             return
         
-        print(f"📊 Found {len(articles)} articles about '{topic}' without embeddings")
+        print(f"📊 Found {total} articles about '{topic}' without embeddings")
         
         # Process in batches
-        total_processed = 0
-        total_successful = 0
-        
-        for i in tqdm(range(0, len(articles), self.batch_size), desc=f"Generating embeddings for {topic}"):
-            batch = articles[i:i + self.batch_size]
-            
-            # Generate embeddings for batch
-            embeddings_map = self.generate_embeddings_batch(batch)
-            
-            # Update database
-            if embeddings_map:
-                self.update_embeddings_in_neo4j(embeddings_map)
-                total_successful += len(embeddings_map)
-            
-            total_processed += len(batch)
+        total_processed, total_successful = self._process_in_batches(
+            self.get_articles_with_topic(topic, limit), f"Generating embeddings for {topic}", total)
         
         print(f"✅ Processed {total_processed} articles about '{topic}'")
         print(f"✅ Successfully generated {total_successful} embeddings")
@@ -244,66 +355,43 @@ class NewsEmbeddingsGeneratorNeo4j:
         """Regenerate embeddings for all articles"""
         if force:
             print("🔄 Regenerating ALL embeddings (forced)...")
-            query = """
-            MATCH (a:Article)
-            WHERE (a.title IS NOT NULL OR a.abstract IS NOT NULL)
-            RETURN a.uri as uri, a.title as title, a.abstract as abstract
-            ORDER BY a.published DESC
-            """
         else:
             print("🔄 This will regenerate embeddings for articles that already have them.")
             response = input("Are you sure? (y/N): ")
             if response.lower() != 'y':
                 print("❌ Operation cancelled")
                 return
-            
-            query = """
-            MATCH (a:Article)
-            WHERE (a.title IS NOT NULL OR a.abstract IS NOT NULL)
-            RETURN a.uri as uri, a.title as title, a.abstract as abstract
-            ORDER BY a.published DESC
-            """
         
-        with self.driver.session(database=self.database) as session:
-            result = session.run(query)
-            articles = []
-            
-            for record in result:
-                articles.append({
-                    'uri': record['uri'],
-                    'title': record['title'] or '',
-                    'abstract': record['abstract'] or ''
-                })
+        total = self._count_articles(self.ALL_ARTICLES_MATCH)
+        print(f"📊 Found {total} articles to process")
+        self._prepare_vector_index(total)
         
-        print(f"📊 Found {len(articles)} articles to process")
-        
-        # Process in batches
-        total_processed = 0
-        total_successful = 0
-        
-        for i in tqdm(range(0, len(articles), self.batch_size), desc="Regenerating embeddings"):
-            batch = articles[i:i + self.batch_size]
-            
-            # Generate embeddings for batch
-            embeddings_map = self.generate_embeddings_batch(batch)
-            
-            # Update database
-            if embeddings_map:
-                self.update_embeddings_in_neo4j(embeddings_map)
-                total_successful += len(embeddings_map)
+        try:
+            # Process in batches
+            total_processed, total_successful = self._process_in_batches(
+                self._stream_articles(self.ALL_ARTICLES_MATCH), "Regenerating embeddings", total)
             
-            total_processed += len(batch)
-        
-        print(f"✅ Processed {total_processed} articles")
-        print(f"✅ Successfully regenerated {total_successful} embeddings")
-        
-        # Update vector index
-        self._update_vector_index()
+            print(f"✅ Processed {total_processed} articles")
+            print(f"✅ Successfully regenerated {total_successful} embeddings")
+        finally:
+            # Rebuild the index even if the run fails or is interrupted, so vector search keeps working
+            self._update_vector_index()
+    
+    def _prepare_vector_index(self, total: int):
+        """Drop the vector index before a bulk run so it is built once on the final vectors"""
+        if total > self.index_rebuild_threshold:
+            print(f"🔄 Dropping vector index for bulk update of {total} articles (rebuilt when the run ends)...")
+            self.config.drop_vector_index()
     
     def _update_vector_index(self):
-        """Update or recreate the vector index"""
+        """
+        Update or recreate the vector index
+        
+        Call this once at the end of a run, never per batch: (re)building the HNSW index
+        costs O(N log N) over all embedded articles.
+        """
         try:
-            print("🔄 Updating vector index...")
+            print("🔄 Rebuilding vector index...")
             self.config.create_vector_index()
             print("✅ Vector index updated")
         except Exception as e:
@@ -319,20 +407,18 @@ class NewsEmbeddingsGeneratorNeo4j:
             count(a) - count(a.embedding) as articles_without_embeddings
         """
         
-        with self.driver.session(database=self.database) as session:
-            result = session.run(stats_query)
-            record = result.single()
-            
-            total = record['total_articles']
-            with_embeddings = record['articles_with_embeddings']
-            without_embeddings = record['articles_without_embeddings']
-            
-            percentage = (with_embeddings / total * 100) if total > 0 else 0
-            
-            print(f"📊 Embedding Statistics:")
-            print(f"  Total articles: {total}")
-            print(f"  With embeddings: {with_embeddings} ({percentage:.1f}%)")
-            print(f"  Without embeddings: {without_embeddings}")
+        record = self._read_single(stats_query)
+        
+        total = record['total_articles']
+        with_embeddings = record['articles_with_embeddings']
+        without_embeddings = record['articles_without_embeddings']
+        
+        percentage = (with_embeddings / total * 100) if total > 0 else 0
+        
+        print(f"📊 Embedding Statistics:")
+        print(f"  Total articles: {total}")
+        print(f"  With embeddings: {with_embeddings} ({percentage:.1f}%)")
+        print(f"  Without embeddings: {without_embeddings}")
     
     def close(self):
         """Close Neo4j connection"""
@@ -345,9 +431,13 @@ def main():
     parser.add_argument('--limit', type=int, help='Maximum number of articles to process')
     parser.add_argument('--topic', help='Generate embeddings only for articles about this topic')
     parser.add_argument('--batch-size', type=int, help='Batch size for processing')
+    parser.add_argument('--max-inflight', type=int, help='Number of embedding batches sent to the provider concurrently')
     parser.add_argument('--regenerate', action='store_true', help='Regenerate all embeddings')
     parser.add_argument('--force', action='store_true', help='Force regeneration without confirmation')
     parser.add_argument('--stats', action='store_true', help='Show embedding statistics only')
+    parser.add_argument('--verbose', action='store_true', help='Print a line for every batch written')
+    parser.add_argument('--mark-pending', action='store_true',
+                        help='Label existing articles without embeddings as pending before processing')
     
     args = parser.parse_args()
     
@@ -358,6 +448,13 @@ def main():
         # Override batch size if specified
         if args.batch_size:
             generator.batch_size = args.batch_size
+        if args.max_inflight:
+            generator.max_inflight = args.max_inflight
+        generator.verbose = args.verbose
+        
+        if args.mark_pending:
+            # Backfill the pending label on graphs imported before it existed
+            generator.mark_pending_articles()
         
         if args.stats:
             # Show statistics only
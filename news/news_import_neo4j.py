@@ -8,44 +8,121 @@ generating AI embeddings for semantic search capabilities.
 
 import os
 import sys
-import json
 import uuid
 import re
 import argparse
-from typing import List, Dict, Any, Optional
+import itertools
+import logging
+import queue
+from collections import deque
+from logging.handlers import QueueHandler, QueueListener
+from typing import List, Dict, Any, Optional, Tuple, Iterator, Iterable
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from tqdm import tqdm
-from datetime import datetime
 from dotenv import load_dotenv
 
 # Add the current directory to the path for imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from neo4j_config import load_neo4j_config
-from ai_provider import get_ai_provider
+from ai_provider import get_ai_provider, get_embeddings_batch
+from geocode_cache import GeocodeCache
+from import_pipeline import BatchWriter, ThreadSessions, load_file_articles, parse_files, stream_file_articles
+import fast_json
 
 # Load environment variables
 load_dotenv()
 
+# Separators between author names in a byline ("A, B and C")
+_BYLINE_SPLIT = re.compile(r',\s*|\s+and\s+')
+
+# Publication dates Neo4j's datetime() accepts (date, optional time and offset)
+_ISO_DATETIME = re.compile(r'\d{4}-\d{2}-\d{2}(T\d{2}:\d{2}(:\d{2}(\.\d+)?)?(Z|[+-]\d{2}(:?\d{2})?)?)?$')
+
+# Per-article and per-batch diagnostics go through a queue to a listener thread, so parse and
+# writer threads never block on a (possibly line-buffered) stdout
+log = logging.getLogger('news_import')
+
+def _start_log_listener() -> QueueListener:
+    """Attach a queue handler to the importer logger and start the thread that prints its records"""
+    records = queue.SimpleQueue()
+    log.handlers = [QueueHandler(records)]
+    log.setLevel(os.getenv('LOG_LEVEL', 'INFO').upper())
+    log.propagate = False
+    
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    listener = QueueListener(records, handler)
+    listener.start()
+    return listener
+
 class NewsImporterNeo4j:
     """Main class for importing news articles into Neo4j"""
     
+    # Keyword name -> entity list it feeds (besides topics, which take every keyword)
+    KEYWORD_ENTITY_TYPES = {
+        'organizations': 'organizations',
+        'persons': 'persons',
+        'glocations': 'locations',
+        'locations': 'locations',
+    }
+    
+    # Facet list on an article -> entity list it feeds
+    FACET_FIELDS = (
+        ('des_facet', 'topics'),
+        ('org_facet', 'organizations'),
+        ('per_facet', 'persons'),
+        ('geo_facet', 'locations'),
+    )
+    
+    # Article schema -> extractor method
+    EXTRACTORS = {
+        'search_api': '_extract_search_api',
+        'top_stories': '_extract_top_stories',
+        'raw': '_extract_raw',
+    }
+    
     def __init__(self, config_file: str = "config.env"):
         """Initialize the importer with configuration"""
         self.config = load_neo4j_config(config_file)
         self.driver = self.config.get_driver()
         self.database = self.config.get_database()
         self.ai_provider = get_ai_provider()
+        self._log_listener = _start_log_listener()
         
         # Configuration from environment
         self.batch_size = int(os.getenv('BATCH_SIZE', '100'))
         self.data_dir = os.getenv('DATA_DIR', 'data/articles')
+        self.write_concurrency = int(os.getenv('IMPORT_CONCURRENCY', '4'))
+        self.parse_workers = int(os.getenv('IMPORT_PARSE_WORKERS', str(min(os.cpu_count() or 1, 8))))
+        self.geocode_prompt_batch = int(os.getenv('GEOCODE_PROMPT_BATCH', '25'))
+        self.geocode_concurrency = int(os.getenv('GEOCODE_CONCURRENCY', '8'))
+        self.geocode_cache = GeocodeCache()
+        # Reuse the coordinates of a near-identical location name ("NYC" / "New York City"),
+        # matched by embedding similarity, before asking the AI provider
+        self.geocode_similarity = os.getenv('GEOCODE_SIMILARITY_CACHE', 'false').lower() == 'true'
+        self.geocode_similarity_threshold = float(os.getenv('GEOCODE_SIMILARITY_THRESHOLD', '0.95'))
         self.embedding_batch_size = int(os.getenv('EMBEDDING_BATCH_SIZE', '50'))
+        # Embedding every article is billed per token, so it only happens when asked for
+        # (--embeddings or SKIP_EMBEDDINGS=false)
+        self.skip_embeddings = os.getenv('SKIP_EMBEDDINGS', 'true').lower() == 'true'
+        self.embedding_max_inflight = int(os.getenv('EMBEDDING_MAX_INFLIGHT', '5'))
+        self._pending_embeddings = []
+        self._embedding_in_flight = deque()
+        self._embedding_executor = None
+        self._embedded_count = 0
+        # Writer threads each keep one session for the whole import
+        self._sessions = ThreadSessions(self.driver, self.database)
         
         print(f"🔧 Configuration loaded:")
         print(f"  Batch size: {self.batch_size}")
         print(f"  Data directory: {self.data_dir}")
+        print(f"  Parse workers: {self.parse_workers}")
+        print(f"  Concurrent batch writes: {self.write_concurrency}")
         print(f"  Embedding batch size: {self.embedding_batch_size}")
+        print(f"  Embedding requests in flight: {self.embedding_max_inflight}")
+        print(f"  Skip embeddings: {self.skip_embeddings}")
         print(f"  AI Provider: {self.ai_provider.__class__.__name__}")
         
         # Initialize schema
@@ -56,8 +133,15 @@ class NewsImporterNeo4j:
         print("🏗️  Setting up Neo4j schema...")
         self.config.create_indexes()
         self.config.create_vector_index()
+        
+        # Concurrent MERGEs of one name only stay a single node under a uniqueness constraint
+        if self.write_concurrency > 1 and self.config.missing_unique_constraints():
+            print("⚠️  Uniqueness constraints missing, writing batches on a single thread")
+            self.write_concurrency = 1
+        self._warm_up_queries()
     
-    def _parse_byline(self, byline: str) -> List[str]:
+    @classmethod
+    def _parse_byline(cls, byline: str) -> List[str]:
         """Extract author names from byline like 'By Author1, Author2 and Author3'"""
         if not byline or not isinstance(byline, str):
             return []
@@ -67,8 +151,7 @@ class NewsImporterNeo4j:
             byline = byline[3:]
         
         # Split by commas and 'and'
-        authors = re.split(r',\s*|\s+and\s+', byline)
-        return [author.strip() for author in authors if author.strip()]
+        return [author for author in map(str.strip, _BYLINE_SPLIT.split(byline)) if author]
     
     def _geocode_location(self, location: str) -> Optional[Dict[str, float]]:
         """Geocode a location string to coordinates"""
@@ -80,7 +163,7 @@ class NewsImporterNeo4j:
             ])
             
             # Try to parse JSON response
-            coordinates = json.loads(response.strip())
+            coordinates = fast_json.loads(response.strip())
             if "lat" in coordinates and "lon" in coordinates:
                 return {"latitude": float(coordinates["lat"]), "longitude": float(coordinates["lon"])}
         except:
@@ -88,82 +171,201 @@ class NewsImporterNeo4j:
         
         return None
     
-    def _process_article(self, article_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Process a single article and extract entities"""
-        # Handle different JSON structures
-        article = article_data
+    def _geocode_locations(self, names: List[str]) -> Dict[str, Dict[str, float]]:
+        """Geocode location names, answering from the geocode cache and asking the AI provider about the rest"""
+        coordinates = self.geocode_cache.get_many(names)
+        missing = [name for name in names if name not in coordinates]
+        
+        if not missing:
+            return coordinates
+        
+        embeddings = {}
+        if self.geocode_similarity:
+            try:
+                # Location names go through the embedding cache like any other text
+                embeddings = dict(zip(missing, get_embeddings_batch(missing)))
+            except Exception as e:
+                log.warning(f"⚠️  Failed to embed location names: {e}")
+            similar = self.geocode_cache.get_similar_many(embeddings, self.geocode_similarity_threshold)
+            if similar:
+                # Cache the match under the new spelling too, so next time it's an exact hit
+                self.geocode_cache.put_many(similar)
+                coordinates.update(similar)
+                missing = [name for name in missing if name not in similar]
+                if not missing:
+                    return coordinates
+        
+        # Several places per prompt, and the prompts themselves run concurrently since each
+        # is a slow, I/O-bound round trip; a failed chunk only leaves its own names unresolved
+        chunks = [missing[start:start + self.geocode_prompt_batch]
+                  for start in range(0, len(missing), self.geocode_prompt_batch)]
+        with ThreadPoolExecutor(max_workers=min(self.geocode_concurrency, len(chunks))) as executor:
+            for found in executor.map(self._geocode_batch, chunks):
+                if found:
+                    self.geocode_cache.put_many(found)
+                    coordinates.update(found)
+                    if embeddings:
+                        self.geocode_cache.put_embeddings({name: embeddings[name] for name in found})
+        
+        return coordinates
+    
+    def _geocode_batch(self, names: List[str]) -> Dict[str, Dict[str, float]]:
+        """Geocode several location names with a single prompt"""
+        if len(names) == 1:
+            coordinates = self._geocode_location(names[0])
+            return {names[0]: coordinates} if coordinates else {}
+        
+        try:
+            prompt = (f"Convert these locations to coordinates: {fast_json.dumps(names).decode('utf-8')}. "
+                      "Return only a JSON object mapping each location, exactly as given, "
+                      "to an object with lat and lon as numbers.")
+            response = self.ai_provider.chat_completion([
+                {"role": "user", "content": prompt}
+            ])
+            result = fast_json.loads(response.strip())
+        except Exception:
+            return {}
+        
+        coordinates = {}
+        if isinstance(result, dict):
+            for name in names:
+                coords = result.get(name)
+                try:
+                    coordinates[name] = {"latitude": float(coords["lat"]), "longitude": float(coords["lon"])}
+                except (KeyError, TypeError, ValueError):
+                    pass
+        return coordinates
+    
+    @staticmethod
+    def _unwrap_article(article_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Return the article inside a wrapped API response (first doc/result), or None if it is empty"""
         if 'response' in article_data and 'docs' in article_data['response']:
-            if article_data['response']['docs']:
-                article = article_data['response']['docs'][0]
-            else:
-                return None
-        elif 'results' in article_data:
-            if article_data['results']:
-                article = article_data['results'][0]
-            else:
-                return None
-        
-        # Extract basic article information
-        title = article.get('headline', {}).get('main', '') or article.get('title', '')
-        abstract = article.get('abstract', '') or article.get('lead_paragraph', '')
+            docs = article_data['response']['docs']
+            return docs[0] if docs else None
+        if 'results' in article_data:
+            results = article_data['results']
+            return results[0] if results else None
+        return article_data
+    
+    @classmethod
+    def _process_articles(cls, articles: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        Process the articles of one file, yielding the non-empty results
+        
+        A file comes from a single feed, so its schema is detected from the first article and
+        every article goes through that feed's extractor instead of probing for each layout.
+        Articles wrapped in an API response are unwrapped first.
+        """
+        articles = (article for article in map(cls._unwrap_article, articles) if article is not None)
+        first = next(articles, None)
+        if first is None:
+            return
+        extractor = getattr(cls, cls.EXTRACTORS[cls._detect_schema(first)])
+        for article in itertools.chain([first], articles):
+            processed = extractor(article)
+            if processed:
+                yield processed
+    
+    @staticmethod
+    def _detect_schema(article: Dict[str, Any]) -> str:
+        """Name the feed an article comes from: 'search_api', 'top_stories' or 'raw'"""
+        if isinstance(article.get('headline'), dict) and 'keywords' in article:
+            return 'search_api'
+        if 'des_facet' in article and 'published_date' in article:
+            return 'top_stories'
+        return 'raw'
+    
+    @classmethod
+    def _extract_search_api(cls, article: Dict[str, Any]) -> Dict[str, Any]:
+        """Article Search API document: headline and byline objects, entities in the keyword list"""
+        byline = article.get('byline') or {}
+        return cls._build_processed(
+            article,
+            title=(article.get('headline') or {}).get('main', ''),
+            abstract=article.get('abstract', '') or article.get('lead_paragraph', ''),
+            url=article.get('web_url', ''),
+            pub_date=article.get('pub_date', ''),
+            byline=byline.get('original', '') if isinstance(byline, dict) else str(byline),
+            entities=cls._keyword_entities(article, {'topics': [], 'organizations': [], 'persons': [], 'locations': []})
+        )
+    
+    @classmethod
+    def _extract_top_stories(cls, article: Dict[str, Any]) -> Dict[str, Any]:
+        """Top Stories / Most Popular result: plain title and byline, entities in the facet lists"""
+        return cls._build_processed(
+            article,
+            title=article.get('title', ''),
+            abstract=article.get('abstract', ''),
+            url=article.get('url', ''),
+            pub_date=article.get('published_date', ''),
+            byline=str(article.get('byline', '')),
+            entities=cls._facet_entities(article, {'topics': [], 'organizations': [], 'persons': [], 'locations': []})
+        )
+    
+    @classmethod
+    def _extract_raw(cls, article: Dict[str, Any]) -> Dict[str, Any]:
+        """An article of unknown layout: try every field the feeds use"""
+        byline = article.get('byline', {}).get('original', '') if isinstance(article.get('byline'), dict) else str(article.get('byline', ''))
         
+        # Entities come from the keyword list (Article Search API) and the facet lists
+        # (Top Stories / Most Popular), keyword values first
+        entities = {'topics': [], 'organizations': [], 'persons': [], 'locations': []}
+        cls._keyword_entities(article, entities)
+        cls._facet_entities(article, entities)
+        
+        return cls._build_processed(
+            article,
+            title=article.get('headline', {}).get('main', '') or article.get('title', ''),
+            abstract=article.get('abstract', '') or article.get('lead_paragraph', ''),
+            url=article.get('web_url', '') or article.get('url', ''),
+            pub_date=article.get('pub_date', '') or article.get('published_date', ''),
+            byline=byline,
+            entities=entities
+        )
+    
+    @classmethod
+    def _keyword_entities(cls, article: Dict[str, Any], entities: Dict[str, List[str]]) -> Dict[str, List[str]]:
+        """Add the keyword values to entities: every value is a topic, and some also name an entity"""
+        add_topic = entities['topics'].append
+        entity_types = cls.KEYWORD_ENTITY_TYPES
+        for kw in article.get('keywords') or ():
+            value = kw.get('value')
+            if not value:
+                continue
+            add_topic(value)
+            entity_type = entity_types.get(kw.get('name'))
+            if entity_type:
+                entities[entity_type].append(value)
+        return entities
+    
+    @classmethod
+    def _facet_entities(cls, article: Dict[str, Any], entities: Dict[str, List[str]]) -> Dict[str, List[str]]:
+        """Add the facet lists (and subject) to entities"""
+        for facet, entity_type in cls.FACET_FIELDS:
+            # The feeds send "" rather than [] for an empty facet
+            entities[entity_type].extend(article.get(facet) or ())
+        if 'subject' in article:
+            entities['topics'].append(article['subject'])
+        return entities
+    
+    @classmethod
+    def _build_processed(cls, article: Dict[str, Any], title: str, abstract: str, url: str,
+                         pub_date: str, byline: str, entities: Dict[str, List[str]]) -> Optional[Dict[str, Any]]:
+        """Assemble the processed article from the fields an extractor pulled out"""
         if not title and not abstract:
             return None
         
         # Generate unique URI
         uri = article.get('uri', f"nyt://article/{uuid.uuid4()}")
-        url = article.get('web_url', '') or article.get('url', '')
         
-        # Parse publication date
-        pub_date = article.get('pub_date', '') or article.get('published_date', '')
-        published = None
-        if pub_date:
-            try:
-                published = datetime.fromisoformat(pub_date.replace('Z', '+00:00'))
-            except:
-                pass
-        
-        # Extract authors
-        byline = article.get('byline', {}).get('original', '') if isinstance(article.get('byline'), dict) else str(article.get('byline', ''))
-        authors = self._parse_byline(byline)
-        
-        # Extract topics/keywords
-        topics = []
-        if 'keywords' in article:
-            topics.extend([kw.get('value', '') for kw in article['keywords'] if kw.get('value')])
-        if 'des_facet' in article:
-            topics.extend(article['des_facet'])
-        if 'subject' in article:
-            topics.append(article['subject'])
-        
-        # Extract organizations
-        organizations = []
-        if 'keywords' in article:
-            organizations.extend([kw.get('value', '') for kw in article['keywords'] 
-                                if kw.get('name') == 'organizations' and kw.get('value')])
-        if 'org_facet' in article:
-            organizations.extend(article['org_facet'])
-        
-        # Extract persons
-        persons = []
-        if 'keywords' in article:
-            persons.extend([kw.get('value', '') for kw in article['keywords'] 
-                          if kw.get('name') == 'persons' and kw.get('value')])
-        if 'per_facet' in article:
-            persons.extend(article['per_facet'])
-        
-        # Extract locations
-        locations = []
-        if 'keywords' in article:
-            locations.extend([kw.get('value', '') for kw in article['keywords'] 
-                            if kw.get('name') in ['glocations', 'locations'] and kw.get('value')])
-        if 'geo_facet' in article:
-            locations.extend(article['geo_facet'])
+        # Publication date stays an ISO string; Neo4j converts it with datetime() on write.
+        # Anything that isn't ISO 8601 is dropped here so it can't fail the whole batch
+        published = pub_date if pub_date and _ISO_DATETIME.match(pub_date) else None
         
         # Extract images
         images = []
         if 'multimedia' in article:
-            for media in article['multimedia']:
+            for media in article['multimedia'] or ():
                 if media.get('type') == 'image' or media.get('format'):
                     images.append({
                         'url': media.get('url', ''),
@@ -178,124 +380,248 @@ class NewsImporterNeo4j:
                 'published': published,
                 'url': url
             },
-            'authors': list(set(authors)),
-            'topics': list(set(topics)),
-            'organizations': list(set(organizations)),
-            'persons': list(set(persons)),
-            'locations': list(set(locations)),
+            # dict.fromkeys drops duplicates but keeps first-seen order, so reruns write the same lists.
+            # Names are interned: a name repeated across a file's articles becomes one object, which
+            # pickle sends back from the parse worker once and batch aggregation hashes once
+            'authors': list(dict.fromkeys(map(sys.intern, cls._parse_byline(byline)))),
+            'topics': list(dict.fromkeys(map(sys.intern, entities['topics']))),
+            'organizations': list(dict.fromkeys(map(sys.intern, entities['organizations']))),
+            'persons': list(dict.fromkeys(map(sys.intern, entities['persons']))),
+            'locations': list(dict.fromkeys(map(sys.intern, entities['locations']))),
             'images': images
         }
     
+    # Batches are written as a handful of UNWIND statements in one transaction: articles first,
+    # then each distinct entity once per batch, then the article -> entity relationships.
+    # Every statement is a fixed string, so the server plans each one once and reuses the plan
+    ARTICLE_BATCH_QUERY = """
+    UNWIND $rows as row
+    MERGE (a:Article {uri: row.uri})
+    ON CREATE SET a:PendingEmbedding
+    SET a.title = row.title,
+        a.abstract = row.abstract,
+        a.published = CASE WHEN row.published IS NULL THEN null ELSE datetime(row.published) END,
+        a.url = row.url
+    """
+    
+    # Entity list key -> (statement merging its distinct nodes, statement merging its relationships)
+    ENTITY_WRITE_QUERIES = {
+        'authors': (
+            "UNWIND $nodes as name MERGE (:Author {name: name})",
+            """
+            UNWIND $edges as edge
+            MATCH (a:Article {uri: edge[0]})
+            MATCH (x:Author {name: edge[1]})
+            MERGE (a)-[:WRITTEN_BY]->(x)
+            """
+        ),
+        'topics': (
+            "UNWIND $nodes as name MERGE (:Topic {name: name})",
+            """
+            UNWIND $edges as edge
+            MATCH (a:Article {uri: edge[0]})
+            MATCH (x:Topic {name: edge[1]})
+            MERGE (a)-[:HAS_TOPIC]->(x)
+            """
+        ),
+        'organizations': (
+            "UNWIND $nodes as name MERGE (:Organization {name: name})",
+            """
+            UNWIND $edges as edge
+            MATCH (a:Article {uri: edge[0]})
+            MATCH (x:Organization {name: edge[1]})
+            MERGE (a)-[:MENTIONS_ORGANIZATION]->(x)
+            """
+        ),
+        'persons': (
+            "UNWIND $nodes as name MERGE (:Person {name: name})",
+            """
+            UNWIND $edges as edge
+            MATCH (a:Article {uri: edge[0]})
+            MATCH (x:Person {name: edge[1]})
+            MERGE (a)-[:MENTIONS_PERSON]->(x)
+            """
+        ),
+        'locations': (
+            """
+            UNWIND $nodes as location
+            MERGE (g:Geo {name: location.name})
+            FOREACH (_ IN CASE WHEN location.lat IS NULL THEN [] ELSE [1] END |
+                SET g.location = point({latitude: location.lat, longitude: location.lon}))
+            """,
+            """
+            UNWIND $edges as edge
+            MATCH (a:Article {uri: edge[0]})
+            MATCH (x:Geo {name: edge[1]})
+            MERGE (a)-[:LOCATED_IN]->(x)
+            """
+        ),
+        'images': (
+            """
+            UNWIND $nodes as image
+            MERGE (i:Image {url: image.url})
+            SET i.caption = image.caption
+            """,
+            """
+            UNWIND $edges as edge
+            MATCH (a:Article {uri: edge[0]})
+            MATCH (x:Image {url: edge[1]})
+            MERGE (a)-[:HAS_IMAGE]->(x)
+            """
+        ),
+    }
+    
+    # Entity lists whose items are plain names
+    NAME_ENTITY_KEYS = ('authors', 'topics', 'organizations', 'persons', 'locations')
+    
+    EMBEDDING_UPDATE_QUERY = """
+    UNWIND $rows as row
+    MATCH (a:Article {uri: row.uri})
+    CALL db.create.setNodeVectorProperty(a, 'embedding', row.vector)
+    REMOVE a:PendingEmbedding
+    """
+    
+    def _batch_payload(self, batch: List[Dict[str, Any]],
+                       coordinates: Dict[str, Dict[str, float]]) -> Dict[str, Any]:
+        """
+        Aggregate processed articles into the parameters of the batch statements: article rows,
+        the distinct entities per list and the (article uri, entity key) edges, with locations
+        placed using the already resolved coordinates
+        """
+        names = {key: {} for key in self.NAME_ENTITY_KEYS}
+        edges = {key: [] for key in self.ENTITY_WRITE_QUERIES}
+        images = {}
+        articles = []
+        
+        for item in batch:
+            article = item['article']
+            uri = article['uri']
+            articles.append(article)
+            for key in self.NAME_ENTITY_KEYS:
+                entity_names = [name for name in item[key] if name]
+                names[key].update(dict.fromkeys(entity_names))
+                edges[key] += [(uri, name) for name in entity_names]
+            for image in item['images']:
+                if image['url']:
+                    images[image['url']] = image
+                    edges['images'].append((uri, image['url']))
+        
+        locations = []
+        for name in names['locations']:
+            coords = coordinates.get(name, {})
+            locations.append({'name': name, 'lat': coords.get('latitude'), 'lon': coords.get('longitude')})
+        
+        nodes = {key: list(values) for key, values in names.items()}
+        nodes['locations'] = locations
+        nodes['images'] = list(images.values())
+        return {'articles': articles, 'nodes': nodes, 'edges': edges}
+    
+    @classmethod
+    def _write_batch(cls, tx, payload: Dict[str, Any]):
+        """Write an aggregated batch inside one managed transaction"""
+        tx.run(cls.ARTICLE_BATCH_QUERY, rows=payload['articles']).consume()
+        for key, (node_query, edge_query) in cls.ENTITY_WRITE_QUERIES.items():
+            if payload['nodes'][key]:
+                tx.run(node_query, nodes=payload['nodes'][key]).consume()
+                tx.run(edge_query, edges=payload['edges'][key]).consume()
+    
+    def _warm_up_queries(self):
+        """Run every write statement once with no rows, so the first real batch finds its plans cached"""
+        def warm_up(tx):
+            tx.run(self.ARTICLE_BATCH_QUERY, rows=[]).consume()
+            for node_query, edge_query in self.ENTITY_WRITE_QUERIES.values():
+                tx.run(node_query, nodes=[]).consume()
+                tx.run(edge_query, edges=[]).consume()
+            tx.run(self.EMBEDDING_UPDATE_QUERY, rows=[]).consume()
+        
+        try:
+            with self.driver.session(database=self.database) as session:
+                session.execute_write(warm_up)
+        except Exception as e:
+            print(f"⚠️  Query warm-up failed: {e}")
+    
     def _import_batch_to_neo4j(self, batch: List[Dict[str, Any]]):
-        """Import a batch of processed articles to Neo4j"""
-        with self.driver.session(database=self.database) as session:
-            # Create articles and their relationships
+        """Import a batch of processed articles to Neo4j in a single transaction"""
+        # Resolve every distinct location first, so no provider round trip happens inside a
+        # transaction (or again in a retry or the per-article fallback)
+        coordinates = self._geocode_locations(
+            list(dict.fromkeys(name for item in batch for name in item['locations'] if name))
+        )
+        payload = self._batch_payload(batch, coordinates)
+        
+        session = self._sessions.get()
+        try:
+            session.execute_write(self._write_batch, payload)
+        except Exception as e:
+            log.error(f"❌ Error importing batch, retrying articles individually: {e}")
+            # Fall back to one transaction per article so one bad row doesn't lose the batch
             for item in batch:
                 try:
-                    self._create_article_and_relationships(session, item)
+                    session.execute_write(self._write_batch, self._batch_payload([item], coordinates))
                 except Exception as e:
-                    print(f"❌ Error importing article {item['article']['uri']}: {e}")
-    
-    def _create_article_and_relationships(self, session, item: Dict[str, Any]):
-        """Create article node and all its relationships"""
-        article = item['article']
-        
-        # Create article node
-        article_query = """
-        MERGE (a:Article {uri: $uri})
-        SET a.title = $title,
-            a.abstract = $abstract,
-            a.published = $published,
-            a.url = $url
-        RETURN a
-        """
-        
-        session.run(article_query, 
-                   uri=article['uri'],
-                   title=article['title'],
-                   abstract=article['abstract'],
-                   published=article['published'],
-                   url=article['url'])
-        
-        # Create authors and relationships
-        for author_name in item['authors']:
-            if author_name:
-                author_query = """
-                MATCH (a:Article {uri: $uri})
-                MERGE (author:Author {name: $name})
-                MERGE (a)-[:WRITTEN_BY]->(author)
-                """
-                session.run(author_query, uri=article['uri'], name=author_name)
-        
-        # Create topics and relationships
-        for topic_name in item['topics']:
-            if topic_name:
-                topic_query = """
-                MATCH (a:Article {uri: $uri})
-                MERGE (t:Topic {name: $name})
-                MERGE (a)-[:HAS_TOPIC]->(t)
-                """
-                session.run(topic_query, uri=article['uri'], name=topic_name)
-        
-        # Create organizations and relationships
-        for org_name in item['organizations']:
-            if org_name:
-                org_query = """
-                MATCH (a:Article {uri: $uri})
-                MERGE (o:Organization {name: $name})
-                MERGE (a)-[:MENTIONS_ORGANIZATION]->(o)
-                """
-                session.run(org_query, uri=article['uri'], name=org_name)
-        
-        # Create persons and relationships
-        for person_name in item['persons']:
-            if person_name:
-                person_query = """
-                MATCH (a:Article {uri: $uri})
-                MERGE (p:Person {name: $name})
-                MERGE (a)-[:MENTIONS_PERSON]->(p)
-                """
-                session.run(person_query, uri=article['uri'], name=person_name)
-        
-        # Create locations and relationships
-        for location_name in item['locations']:
-            if location_name:
-                # Try to geocode the location
-                coordinates = self._geocode_location(location_name)
-                
-                if coordinates:
-                    geo_query = """
-                    MATCH (a:Article {uri: $uri})
-                    MERGE (g:Geo {name: $name})
-                    SET g.location = point({latitude: $lat, longitude: $lon})
-                    MERGE (a)-[:LOCATED_IN]->(g)
-                    """
-                    session.run(geo_query, 
-                               uri=article['uri'], 
-                               name=location_name,
-                               lat=coordinates['latitude'],
-                               lon=coordinates['longitude'])
-                else:
-                    geo_query = """
-                    MATCH (a:Article {uri: $uri})
-                    MERGE (g:Geo {name: $name})
-                    MERGE (a)-[:LOCATED_IN]->(g)
-                    """
-                    session.run(geo_query, uri=article['uri'], name=location_name)
-        
-        # Create images and relationships
-        for image in item['images']:
-            if image['url']:
-                image_query = """
-                MATCH (a:Article {uri: $uri})
-                MERGE (i:Image {url: $url})
-                SET i.caption = $caption
-                MERGE (a)-[:HAS_IMAGE]->(i)
-                """
-                session.run(image_query, 
-                           uri=article['uri'], 
-                           url=image['url'],
-                           caption=image['caption'])
+                    log.error(f"❌ Error importing article {item['article']['uri']}: {e}")
+    
+    def _on_batch_written(self, batch: List[Dict[str, Any]]):
+        """Queue the articles of a written batch for embedding"""
+        if not self.skip_embeddings:
+            self._queue_embeddings(batch)
+    
+    def _queue_embeddings(self, batch: List[Dict[str, Any]]):
+        """Queue the texts of written articles, sending each full chunk to the provider right away"""
+        # Same "title. abstract" text as news_embeddings_neo4j.py, so both share cache entries
+        for item in batch:
+            text = '. '.join(part.strip() for part in (item['article']['title'], item['article']['abstract'])
+                             if part and part.strip())
+            if text:
+                self._pending_embeddings.append((item['article']['uri'], text))
+        
+        # Chunks keep embedding_batch_size texts per provider request across file and batch
+        # boundaries, and only one partial chunk is ever held in memory
+        while len(self._pending_embeddings) >= self.embedding_batch_size:
+            self._submit_embeddings(self._pending_embeddings[:self.embedding_batch_size])
+            del self._pending_embeddings[:self.embedding_batch_size]
+    
+    def _submit_embeddings(self, chunk: List[Tuple[str, str]]):
+        """Embed a chunk on a worker thread, waiting for the oldest once embedding_max_inflight are running"""
+        # Provider requests are I/O-bound, so several chunks are embedded and written at once
+        self._embedding_in_flight.append(self._embedding_executor.submit(self._embed_chunk, chunk))
+        while len(self._embedding_in_flight) >= self.embedding_max_inflight:
+            self._wait_for_embeddings(self._embedding_in_flight.popleft())
+    
+    def _wait_for_embeddings(self, future):
+        """Wait for an embedding chunk and count the vectors it stored"""
+        try:
+            self._embedded_count += future.result()
+        except Exception as e:
+            log.error(f"❌ Error writing embeddings: {e}")
+    
+    def _finish_embeddings(self):
+        """Embed the last partial chunk and wait for every chunk still running"""
+        if self._pending_embeddings:
+            self._submit_embeddings(self._pending_embeddings)
+            self._pending_embeddings = []
+        while self._embedding_in_flight:
+            self._wait_for_embeddings(self._embedding_in_flight.popleft())
+    
+    def _embed_chunk(self, chunk: List[Tuple[str, str]]) -> int:
+        """Embed one chunk of (uri, text) pairs and store the vectors on their nodes, returning the count"""
+        try:
+            # Texts already in the content-addressed embedding cache are not re-sent to the provider
+            vectors = get_embeddings_batch([text for _, text in chunk])
+        except Exception as e:
+            log.warning(f"⚠️  Failed to generate embeddings for batch: {e}")
+            return 0
+        
+        # The driver sends plain float lists; convert the whole (texts, dims) array in one call
+        # rather than row by row
+        rows = [
+            {'uri': uri, 'vector': vector}
+            for (uri, _), vector in zip(chunk, vectors.tolist())
+            if vector
+        ]
+        
+        self._sessions.get().execute_write(lambda tx: tx.run(self.EMBEDDING_UPDATE_QUERY, rows=rows).consume())
+        return len(rows)
     
     def import_articles(self, data_dir: str = None, limit: int = None):
         """Import articles from JSON files"""
@@ -306,41 +632,47 @@ class NewsImporterNeo4j:
             print(f"❌ Data directory not found: {data_path}")
             return
         
-        # Find all JSON files
-        json_files = list(data_path.glob("**/*.json"))
-        if not json_files:
+        # Walk the tree lazily so the first batches are written while the walk is still going
+        json_files = data_path.rglob("*.json")
+        first_file = next(json_files, None)
+        if first_file is None:
             print(f"❌ No JSON files found in {data_path}")
             return
+        json_files = itertools.chain([first_file], json_files)
         
-        print(f"📁 Found {len(json_files)} JSON files in {data_path}")
+        # A full import gets a file count for the progress bar; a limited one stops early, so skip the extra walk
+        total_files = None
+        if not limit:
+            total_files = sum(1 for _ in data_path.rglob("*.json"))
+            print(f"📁 Found {total_files} JSON files in {data_path}")
+        else:
+            print(f"📁 Reading JSON files from {data_path}")
         
         total_articles = 0
         batch = []
         
-        for json_file in tqdm(json_files, desc="Processing files"):
+        # Batches are written on worker threads (each keeping its own session) while the next
+        # files are parsed. More than one writer is only used once _setup_schema has confirmed the
+        # uniqueness constraints, which make concurrent MERGEs of the same key resolve to one node.
+        # Written articles are embedded on a second pool while the import carries on
+        writer = BatchWriter(self._import_batch_to_neo4j, self.write_concurrency, self._on_batch_written)
+        self._embedding_executor = ThreadPoolExecutor(max_workers=self.embedding_max_inflight)
+        # Files are parsed ahead in worker processes; an error surfaces from .result() for its own file
+        for json_file, parsed in tqdm(parse_files(json_files, _parse_article_file, self.parse_workers),
+                                      total=total_files, desc="Processing files"):
             try:
-                with open(json_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                # Handle different JSON structures
-                articles_data = []
-                if isinstance(data, list):
-                    articles_data = data
-                elif 'response' in data and 'docs' in data['response']:
-                    articles_data = data['response']['docs']
-                elif 'results' in data:
-                    articles_data = data['results']
+                if parsed is not None:
+                    processed_articles = parsed.result()
                 else:
-                    articles_data = [data]
+                    processed_articles = self._process_articles(stream_file_articles(json_file))
                 
-                for article_data in articles_data:
-                    processed = self._process_article(article_data)
+                for processed in processed_articles:
                     if processed:
                         batch.append(processed)
                         total_articles += 1
                         
                         if len(batch) >= self.batch_size:
-                            self._import_batch_to_neo4j(batch)
+                            writer.submit(batch)
                             batch = []
                         
                         if limit and total_articles >= limit:
@@ -350,13 +682,23 @@ class NewsImporterNeo4j:
                     break
                     
             except Exception as e:
-                print(f"❌ Error processing file {json_file}: {e}")
+                log.error(f"❌ Error processing file {json_file}: {e}")
         
         # Import remaining articles in batch
         if batch:
-            self._import_batch_to_neo4j(batch)
+            writer.submit(batch)
+        writer.close()
+        self._finish_embeddings()
+        self._embedding_executor.shutdown()
+        self._sessions.close()
+        
+        # Stopping the listener drains the queued diagnostics, so they print before the totals
+        self._log_listener.stop()
+        self._log_listener.start()
         
         print(f"✅ Imported {total_articles} articles to Neo4j")
+        if not self.skip_embeddings:
+            print(f"✅ Generated {self._embedded_count} embeddings")
         
         # Print summary statistics
         self._print_import_summary()
@@ -382,8 +724,14 @@ class NewsImporterNeo4j:
             print(f"  Relationships: {rel_count}")
     
     def close(self):
-        """Close the Neo4j connection"""
+        """Close the Neo4j connection and the geocode cache, and flush the import log"""
+        self.geocode_cache.close()
         self.config.close()
+        self._log_listener.stop()
+
+def _parse_article_file(json_file: Path) -> List[Dict[str, Any]]:
+    """Read, decode and process one article file (runs in a parse worker process)"""
+    return list(NewsImporterNeo4j._process_articles(load_file_articles(json_file)))
 
 def main():
     """Main entry point"""
@@ -391,9 +739,14 @@ def main():
     parser.add_argument('--config', default='config.env', help='Configuration file path')
     parser.add_argument('--data-dir', help='Directory containing JSON files')
     parser.add_argument('--limit', type=int, help='Maximum number of articles to import')
+    parser.add_argument('--embeddings', action='store_true',
+                        help='Generate embeddings for the imported articles (billed per token by the AI provider)')
     
     args = parser.parse_args()
     
+    if args.embeddings:
+        os.environ['SKIP_EMBEDDINGS'] = 'false'
+    
     try:
         # Create importer
         importer = NewsImporterNeo4j(args.config)
@@ -21,7 +21,7 @@ CREATE CONSTRAINT author_name IF NOT EXISTS FOR (a:Author) REQUIRE a.name IS UNI
 
 // Create constraints and indexes for Geo locations
 CREATE CONSTRAINT geo_name IF NOT EXISTS FOR (g:Geo) REQUIRE g.name IS UNIQUE;
-CREATE INDEX geo_location IF NOT EXISTS FOR (g:Geo) ON (g.location);
+CREATE POINT INDEX geo_location IF NOT EXISTS FOR (g:Geo) ON (g.location);
 
 // Create constraints and indexes for Images
 CREATE INDEX image_url IF NOT EXISTS FOR (i:Image) ON (i.url);
@@ -54,6 +54,7 @@ OPTIONS {
 //   - published (publication date)
 //   - url (article URL)
 //   - embedding (vector for similarity search)
+//   - :PendingEmbedding label (set on import, removed once the embedding is written)
 //
 // Topic:
 //   - name (topic name)
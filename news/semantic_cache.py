@@ -0,0 +1,137 @@
+"""
+Semantic Cache for News Knowledge Graph
+
+Caches chat completion responses keyed by the embedding of the prompt, so
+near-duplicate prompts can be answered locally instead of with another
+round-trip to the AI provider.
+"""
+
+import os
+import time
+import sqlite3
+import threading
+from typing import List, Dict, Optional
+import numpy as np
+import fast_json
+
+class SemanticCache:
+    """SQLite-backed semantic cache using cosine similarity over prompt embeddings"""
+
+    def __init__(self, embedder, path: Optional[str] = None, threshold: Optional[float] = None,
+                 ttl_seconds: Optional[float] = None):
+        """
+        Open (or create) the cache database
+
+        Args:
+            embedder: AIProvider used to embed prompts (a local Ollama model works well)
+            path: SQLite database path
+            threshold: Minimum cosine similarity for a cached response to be reused
+            ttl_seconds: Lifetime of cached responses (None keeps them forever)
+        """
+        self.embedder = embedder
+        self.path = path or os.getenv('SEMANTIC_CACHE_PATH', '.semantic_cache.sqlite')
+        self.threshold = threshold if threshold is not None else float(os.getenv('SEMANTIC_CACHE_THRESHOLD', '0.95'))
+        if ttl_seconds is None and os.getenv('SEMANTIC_CACHE_TTL'):
+            ttl_seconds = float(os.getenv('SEMANTIC_CACHE_TTL'))
+        self.ttl_seconds = ttl_seconds
+
+        self._lock = threading.Lock()
+        # Per-namespace in-memory index: (normalized vectors, responses, expiry epochs)
+        self._index = {}
+
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                id INTEGER PRIMARY KEY,
+                namespace TEXT NOT NULL,
+                embedding BLOB NOT NULL,
+                response TEXT NOT NULL,
+                ttl_epoch REAL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS responses_namespace ON responses (namespace)")
+        self.conn.commit()
+
+    def embed(self, messages: List[Dict[str, str]]) -> np.ndarray:
+        """Embed a conversation as a unit-length float32 vector"""
+        vector = np.asarray(self.embedder.generate_embedding(fast_json.dumps(messages, sort_keys=True).decode('utf-8')),
+                            dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _load_namespace(self, namespace: str):
+        """Load the non-expired entries of a namespace into memory"""
+        if namespace in self._index:
+            return self._index[namespace]
+
+        rows = self.conn.execute(
+            "SELECT embedding, response, ttl_epoch FROM responses "
+            "WHERE namespace = ? AND (ttl_epoch IS NULL OR ttl_epoch > ?)",
+            (namespace, time.time())
+        ).fetchall()
+
+        vectors = [np.frombuffer(row[0], dtype=np.float32) for row in rows]
+        entry = {
+            'vectors': np.vstack(vectors) if vectors else None,
+            'responses': [row[1] for row in rows],
+            'expiry': np.array([row[2] if row[2] is not None else np.inf for row in rows], dtype=np.float64),
+        }
+        self._index[namespace] = entry
+        return entry
+
+    def lookup(self, messages: List[Dict[str, str]], namespace: str = "default",
+               vector: Optional[np.ndarray] = None) -> Optional[str]:
+        """Return a cached response for a semantically similar prompt, or None"""
+        if vector is None:
+            vector = self.embed(messages)
+
+        with self._lock:
+            entry = self._load_namespace(namespace)
+            if entry['vectors'] is None or entry['vectors'].shape[1] != vector.shape[0]:
+                return None
+
+            scores = entry['vectors'] @ vector
+            scores[entry['expiry'] <= time.time()] = -1.0
+            best = int(np.argmax(scores))
+            if scores[best] >= self.threshold:
+                return entry['responses'][best]
+
+        return None
+
+    def store(self, messages: List[Dict[str, str]], response: str, namespace: str = "default",
+              vector: Optional[np.ndarray] = None):
+        """Cache a response for a prompt"""
+        if vector is None:
+            vector = self.embed(messages)
+        ttl_epoch = time.time() + self.ttl_seconds if self.ttl_seconds else None
+
+        with self._lock:
+            # Load before inserting so the new row is not picked up twice
+            entry = self._load_namespace(namespace)
+
+            self.conn.execute(
+                "INSERT INTO responses (namespace, embedding, response, ttl_epoch) VALUES (?, ?, ?, ?)",
+                (namespace, vector.tobytes(), response, ttl_epoch)
+            )
+            self.conn.commit()
+
+            if entry['vectors'] is None:
+                entry['vectors'] = vector[np.newaxis, :]
+            elif entry['vectors'].shape[1] == vector.shape[0]:
+                entry['vectors'] = np.vstack([entry['vectors'], vector])
+            else:
+                return
+            entry['responses'].append(response)
+            entry['expiry'] = np.append(entry['expiry'], ttl_epoch if ttl_epoch is not None else np.inf)
+
+    def purge_expired(self):
+        """Delete expired responses from the database"""
+        with self._lock:
+            self.conn.execute("DELETE FROM responses WHERE ttl_epoch IS NOT NULL AND ttl_epoch <= ?",
+                              (time.time(),))
+            self.conn.commit()
+            self._index.clear()
+
+    def close(self):
+        """Close the cache database"""
+        self.conn.close()
@@ -11,6 +11,7 @@ import sys
 import json
 import argparse
 from typing import List, Dict, Any, Optional
+import numpy as np
 from dotenv import load_dotenv
 
 # Add the current directory to the path for imports
@@ -198,7 +199,7 @@ class NewsDataTesterNeo4j:
             test_text = "This is a test article about technology and artificial intelligence."
             embedding = self.ai_provider.generate_embedding(test_text)
             
-            if embedding and isinstance(embedding, list) and len(embedding) > 0:
+            if isinstance(embedding, np.ndarray) and embedding.ndim == 1 and len(embedding) > 0:
                 print(f"✅ Single embedding generated: {len(embedding)} dimensions")
             else:
                 print("❌ Single embedding generation failed")
@@ -218,10 +219,9 @@ class NewsDataTesterNeo4j:
             
             embeddings = self.ai_provider.generate_embeddings_batch(test_texts)
             
-            if (embeddings and 
-                isinstance(embeddings, list) and 
-                len(embeddings) == len(test_texts) and
-                all(isinstance(emb, list) for emb in embeddings)):
+            if (isinstance(embeddings, np.ndarray) and 
+                embeddings.ndim == 2 and 
+                len(embeddings) == len(test_texts)):
                 print(f"✅ Batch embeddings generated: {len(embeddings)} embeddings")
             else:
                 print("❌ Batch embedding generation failed")
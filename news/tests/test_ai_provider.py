@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Tests for AI provider rate limiting and retries
+
+The client-side token bucket and the retry delay policy, driven by a fake
+clock; no requests are sent.
+"""
+
+import os
+import sys
+
+import pytest
+import requests
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ai_provider
+from ai_provider import TokenBucket, _retry_delay, RETRY_INITIAL_WAIT, RETRY_MAX_WAIT
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Fake monotonic clock; time.sleep advances it and records the wait"""
+    state = {"now": 100.0, "sleeps": []}
+    
+    def sleep(seconds):
+        state["sleeps"].append(seconds)
+        state["now"] += seconds
+    
+    monkeypatch.setattr(ai_provider.time, "monotonic", lambda: state["now"])
+    monkeypatch.setattr(ai_provider.time, "sleep", sleep)
+    return state
+
+
+def http_error(status_code, retry_after=None):
+    """requests.HTTPError carrying a response with the given status"""
+    response = requests.Response()
+    response.status_code = status_code
+    if retry_after is not None:
+        response.headers["Retry-After"] = retry_after
+    return requests.HTTPError(response=response)
+
+
+class TestTokenBucket:
+    """Test the client-side rate limiter."""
+    
+    def test_starts_full(self, clock):
+        """A new bucket serves its whole capacity without waiting."""
+        bucket = TokenBucket(60)
+        for _ in range(60):
+            bucket.acquire()
+        assert clock["sleeps"] == []
+    
+    def test_waits_for_refill(self, clock):
+        """An empty bucket waits until enough tokens have refilled."""
+        bucket = TokenBucket(60)
+        bucket.acquire(60)
+        bucket.acquire(3)
+        assert sum(clock["sleeps"]) == pytest.approx(3.0)
+    
+    def test_refills_over_time(self, clock):
+        """Tokens come back at capacity per minute, up to the capacity."""
+        bucket = TokenBucket(120)
+        bucket.acquire(120)
+        clock["now"] += 30
+        bucket.acquire(60)
+        assert clock["sleeps"] == []
+        
+        clock["now"] += 3600
+        bucket.acquire(1)
+        assert bucket.tokens == pytest.approx(119)
+    
+    def test_oversized_request_is_capped(self, clock):
+        """Asking for more than the capacity takes a full bucket instead of blocking forever."""
+        bucket = TokenBucket(10)
+        bucket.acquire(1000)
+        assert clock["sleeps"] == []
+        assert bucket.tokens == pytest.approx(0)
+    
+    def test_pause_holds_back_callers(self, clock):
+        """pause() delays the next acquire even with tokens available."""
+        bucket = TokenBucket(60)
+        bucket.pause(5)
+        bucket.acquire()
+        assert sum(clock["sleeps"]) == pytest.approx(5.0)
+    
+    def test_pause_does_not_shorten(self, clock):
+        """A shorter pause does not cut an earlier, longer one."""
+        bucket = TokenBucket(60)
+        bucket.pause(10)
+        bucket.pause(2)
+        bucket.acquire()
+        assert sum(clock["sleeps"]) == pytest.approx(10.0)
+
+
+class TestRetryDelay:
+    """Test which errors are retried, and after how long."""
+    
+    @pytest.mark.parametrize("status_code", [429, 500, 502, 503, 504])
+    def test_transient_status_retried(self, status_code):
+        """Rate limits and server errors back off exponentially."""
+        delay = _retry_delay(http_error(status_code), attempt=3)
+        assert RETRY_INITIAL_WAIT * 4 <= delay <= RETRY_INITIAL_WAIT * 5
+    
+    @pytest.mark.parametrize("status_code", [400, 401, 404, 422])
+    def test_client_errors_not_retried(self, status_code):
+        """Client errors fail straight away."""
+        assert _retry_delay(http_error(status_code), attempt=1) is None
+    
+    def test_retry_after_header_honoured(self):
+        """A Retry-After in seconds replaces the backoff."""
+        assert _retry_delay(http_error(429, retry_after="7"), attempt=1) == 7.0
+    
+    def test_retry_after_capped(self):
+        """A long Retry-After is capped at the maximum wait."""
+        assert _retry_delay(http_error(503, retry_after="3600"), attempt=1) == RETRY_MAX_WAIT
+    
+    def test_unparseable_retry_after_falls_back(self):
+        """An HTTP-date Retry-After falls back to the backoff."""
+        delay = _retry_delay(http_error(429, retry_after="Wed, 21 Oct 2015 07:28:00 GMT"), attempt=1)
+        assert RETRY_INITIAL_WAIT <= delay <= RETRY_INITIAL_WAIT * 2
+    
+    @pytest.mark.parametrize("error", [requests.ConnectionError(), requests.Timeout()])
+    def test_network_errors_retried(self, error):
+        """Dropped connections and timeouts are retried."""
+        assert _retry_delay(error, attempt=1) is not None
+    
+    def test_backoff_capped(self):
+        """Late attempts wait at most the maximum plus jitter."""
+        assert _retry_delay(requests.ConnectionError(), attempt=30) <= RETRY_MAX_WAIT + RETRY_INITIAL_WAIT
+    
+    def test_other_errors_not_retried(self):
+        """Programming errors are not retried."""
+        assert _retry_delay(ValueError("bad payload"), attempt=1) is None
+
+
+class TestAnthropicEmbeddings:
+    """Anthropic has no embeddings API, so requests fail before any HTTP call."""
+    
+    @pytest.fixture
+    def provider(self):
+        provider = ai_provider.AnthropicProvider.__new__(ai_provider.AnthropicProvider)
+        provider.session = None  # any HTTP call would fail with AttributeError
+        return provider
+    
+    def test_single_embedding_not_supported(self, provider):
+        """The error is both a NotImplementedError and a ValueError."""
+        with pytest.raises(NotImplementedError):
+            provider.generate_embedding("text")
+        with pytest.raises(ValueError):
+            provider.generate_embedding("text")
+    
+    def test_batch_embeddings_not_supported(self, provider):
+        """Batch requests raise the same error."""
+        with pytest.raises(ai_provider.EmbeddingsNotSupportedError):
+            provider.generate_embeddings_batch(["a", "b"])
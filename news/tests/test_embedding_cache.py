@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Tests for the embedding cache
+
+Vector encodings, migration of caches created before precision support, and
+consistency of the in-process LRU layer with the SQLite database.
+"""
+
+import os
+import sys
+import sqlite3
+
+import numpy as np
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from embedding_cache import EmbeddingCache, encode_vector, decode_vector, simhash
+
+
+@pytest.fixture
+def vector():
+    """A vector with values of mixed sign and magnitude"""
+    return np.random.default_rng(0).normal(size=256).astype(np.float32)
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "embeddings.sqlite")
+
+
+class TestVectorEncoding:
+    """Test encode_vector / decode_vector round trips."""
+    
+    def test_fp32_is_exact(self, vector):
+        """fp32 entries decode to the stored vector."""
+        blob, scale = encode_vector(vector, "fp32")
+        assert scale is None
+        np.testing.assert_array_equal(decode_vector(blob, "fp32", scale), vector)
+    
+    def test_fp16_round_trip(self, vector):
+        """fp16 entries take half the space and stay within half precision."""
+        blob, scale = encode_vector(vector, "fp16")
+        assert len(blob) == vector.size * 2
+        decoded = decode_vector(blob, "fp16", scale)
+        assert decoded.dtype == np.float32
+        np.testing.assert_allclose(decoded, vector, rtol=1e-3, atol=1e-3)
+    
+    def test_int8_round_trip(self, vector):
+        """int8 entries take a quarter of the space and are off by at most half a step."""
+        blob, scale = encode_vector(vector, "int8")
+        assert len(blob) == vector.size
+        assert scale == pytest.approx(np.max(np.abs(vector)) / 127)
+        decoded = decode_vector(blob, "int8", scale)
+        assert decoded.dtype == np.float32
+        assert np.max(np.abs(decoded - vector)) <= scale / 2 + 1e-6
+    
+    def test_int8_zero_vector(self):
+        """An all-zero vector does not divide by zero."""
+        blob, scale = encode_vector(np.zeros(8, dtype=np.float32), "int8")
+        np.testing.assert_array_equal(decode_vector(blob, "int8", scale), np.zeros(8))
+    
+    def test_unknown_precision_rejected(self, cache_path):
+        """The cache refuses precisions it cannot decode."""
+        with pytest.raises(ValueError):
+            EmbeddingCache(cache_path, precision="fp8")
+
+
+class TestSchemaMigration:
+    """Test opening caches created before precision support."""
+    
+    def test_old_cache_is_migrated(self, cache_path, vector):
+        """Old (key, vec) rows gain the new columns and still decode as fp32."""
+        conn = sqlite3.connect(cache_path)
+        conn.execute("CREATE TABLE embeddings (key TEXT PRIMARY KEY, vec BLOB)")
+        conn.execute("INSERT INTO embeddings VALUES (?, ?)",
+                     (EmbeddingCache.make_key("model", "old text"), vector.tobytes()))
+        conn.commit()
+        conn.close()
+        
+        cache = EmbeddingCache(cache_path, precision="int8")
+        columns = {row[1] for row in cache.conn.execute("PRAGMA table_info(embeddings)")}
+        assert {"precision", "scale"} <= columns
+        np.testing.assert_array_equal(cache.get("model", "old text"), vector)
+        
+        # New entries use the configured precision next to the old ones
+        cache.put("model", "new text", vector)
+        assert cache.conn.execute("SELECT precision FROM embeddings WHERE key = ?",
+                                  (EmbeddingCache.make_key("model", "new text"),)).fetchone()[0] == "int8"
+        cache.close()
+    
+    def test_reopening_migrated_cache(self, cache_path, vector):
+        """Opening an up-to-date cache again leaves its entries alone."""
+        cache = EmbeddingCache(cache_path, precision="fp16")
+        cache.put("model", "text", vector)
+        cache.close()
+        
+        cache = EmbeddingCache(cache_path)
+        np.testing.assert_allclose(cache.get("model", "text"), vector, rtol=1e-3, atol=1e-3)
+        cache.close()
+
+
+class TestCacheConsistency:
+    """Test the LRU layer against the SQLite database."""
+    
+    def test_lru_evicts_oldest(self, cache_path, vector):
+        """Only the most recently used memory_size entries stay in memory."""
+        cache = EmbeddingCache(cache_path, memory_size=2)
+        cache.put_many("model", {"a": vector, "b": vector + 1})
+        cache.get("model", "a")
+        cache.put("model", "c", vector + 2)
+        
+        assert set(cache._memory) == {EmbeddingCache.make_key("model", text) for text in ("a", "c")}
+        cache.close()
+    
+    def test_evicted_entries_come_from_sqlite(self, cache_path, vector):
+        """An entry evicted from memory is read back from the database and remembered again."""
+        cache = EmbeddingCache(cache_path, memory_size=1)
+        cache.put_many("model", {"a": vector, "b": vector + 1})
+        key = EmbeddingCache.make_key("model", "a")
+        assert key not in cache._memory
+        
+        np.testing.assert_array_equal(cache.get("model", "a"), vector)
+        assert key in cache._memory
+        cache.close()
+    
+    def test_overwrite_updates_both_layers(self, cache_path, vector):
+        """Storing a text again replaces it in memory and on disk."""
+        cache = EmbeddingCache(cache_path)
+        cache.put("model", "a", vector)
+        cache.put("model", "a", vector * 2)
+        np.testing.assert_array_equal(cache.get("model", "a"), vector * 2)
+        
+        other = EmbeddingCache(cache_path)
+        np.testing.assert_array_equal(other.get("model", "a"), vector * 2)
+        other.close()
+        cache.close()
+    
+    def test_get_many_omits_misses(self, cache_path, vector):
+        """Misses are left out, and keys are per model."""
+        cache = EmbeddingCache(cache_path)
+        cache.put("model", "a", vector)
+        
+        assert list(cache.get_many("model", ["a", "missing"])) == ["a"]
+        assert cache.get("other-model", "a") is None
+        cache.close()
+
+
+class TestFuzzyLookup:
+    """Test SimHash sketches for near-duplicate lookups."""
+    
+    def test_no_sketches_when_fuzzy_off(self, cache_path, vector):
+        """Exact-only caches skip the SimHash work."""
+        cache = EmbeddingCache(cache_path, fuzzy=False)
+        cache.put("model", "A headline about the city budget", vector)
+        assert cache.conn.execute("SELECT count(*) FROM sketches").fetchone()[0] == 0
+        cache.close()
+    
+    def test_near_duplicate_found(self, cache_path, vector):
+        """A text differing by punctuation and case reuses the cached embedding."""
+        cache = EmbeddingCache(cache_path, fuzzy=True)
+        cache.put("model", "A headline about the city budget vote", vector)
+        
+        found = cache.get_similar_many("model", ["a headline about the city budget vote!"])
+        np.testing.assert_array_equal(found["a headline about the city budget vote!"], vector)
+        assert cache.get_similar_many("model", ["Something else entirely"]) == {}
+        cache.close()
+    
+    def test_sketches_backfilled_on_exact_hit(self, cache_path, vector):
+        """Entries stored with fuzzy lookups off are sketched when their text is seen again."""
+        cache = EmbeddingCache(cache_path, fuzzy=False)
+        cache.put("model", "A headline about the city budget vote", vector)
+        cache.close()
+        
+        cache = EmbeddingCache(cache_path, fuzzy=True)
+        assert cache.get_similar_many("model", ["a headline about the city budget vote!"]) == {}
+        cache.get("model", "A headline about the city budget vote")
+        assert "a headline about the city budget vote!" in cache.get_similar_many(
+            "model", ["a headline about the city budget vote!"])
+        cache.close()
+    
+    def test_simhash_is_stable(self):
+        """Sketches are deterministic 64-bit integers."""
+        assert simhash("Same text") == simhash("same   TEXT")
+        assert 0 <= simhash("Same text") < 2 ** 64
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Tests for the geo kernels
+
+Great-circle distances against known city distances, and radius clustering.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from geo_kernels import haversine_matrix, cluster_locations, _haversine_matrix_numpy
+
+# (latitude, longitude)
+LONDON = (51.5074, -0.1278)
+PARIS = (48.8566, 2.3522)
+NEW_YORK = (40.7128, -74.0060)
+LOS_ANGELES = (34.0522, -118.2437)
+SYDNEY = (-33.8688, 151.2093)
+
+
+def distance(a, b):
+    return float(haversine_matrix([a[0]], [a[1]], [b[0]], [b[1]])[0, 0])
+
+
+class TestHaversine:
+    """Test great-circle distances."""
+    
+    @pytest.mark.parametrize("a, b, expected_km", [
+        (LONDON, PARIS, 343.5),
+        (NEW_YORK, LOS_ANGELES, 3935.7),
+        (LONDON, NEW_YORK, 5570.2),
+        (LONDON, SYDNEY, 16993.9),
+    ])
+    def test_known_distances(self, a, b, expected_km):
+        """Distances between cities match published great-circle values within 0.5%."""
+        assert distance(a, b) == pytest.approx(expected_km, rel=0.005)
+    
+    def test_quarter_meridian(self):
+        """Equator to pole is a quarter of the circumference."""
+        assert distance((0.0, 0.0), (90.0, 0.0)) == pytest.approx(np.pi * 6371.0088 / 2)
+    
+    def test_antipodes(self):
+        """Opposite points are half the circumference apart (no NaN from rounding)."""
+        assert distance((0.0, 0.0), (0.0, 180.0)) == pytest.approx(np.pi * 6371.0088)
+    
+    def test_matrix_shape_and_symmetry(self):
+        """The matrix is (len(first), len(second)), symmetric with a zero diagonal for one set."""
+        points = np.array([LONDON, PARIS, NEW_YORK, SYDNEY])
+        matrix = haversine_matrix(points[:, 0], points[:, 1], points[:, 0], points[:, 1])
+        assert matrix.shape == (4, 4)
+        np.testing.assert_allclose(matrix, matrix.T)
+        np.testing.assert_allclose(np.diag(matrix), 0.0, atol=1e-9)
+        
+        assert haversine_matrix(points[:1, 0], points[:1, 1], points[:, 0], points[:, 1]).shape == (1, 4)
+    
+    def test_matches_numpy_kernel(self):
+        """The dispatched kernel (JIT when numba is installed) agrees with the NumPy one."""
+        rng = np.random.default_rng(0)
+        lat, lon = rng.uniform(-90, 90, 50), rng.uniform(-180, 180, 50)
+        np.testing.assert_allclose(haversine_matrix(lat, lon, lat, lon),
+                                   _haversine_matrix_numpy(lat, lon, lat, lon), rtol=1e-6, atol=1e-6)
+
+
+class TestClustering:
+    """Test radius clustering with union-find."""
+    
+    def test_separate_groups(self):
+        """Points within the radius share a cluster; far groups do not."""
+        points = np.array([LONDON, (51.5, -0.1), NEW_YORK, (40.73, -73.99), PARIS])
+        ids = cluster_locations(points[:, 0], points[:, 1], radius_km=50)
+        assert ids.tolist() == [0, 0, 1, 1, 2]
+    
+    def test_chained_hops_merge(self):
+        """Points linked by a chain of short hops form one cluster, even past the radius end to end."""
+        # About 11 km between neighbours along the equator, 110 km end to end
+        lon = np.arange(11) * 0.1
+        ids = cluster_locations(np.zeros(11), lon, radius_km=12)
+        assert set(ids.tolist()) == {0}
+    
+    def test_blocks_merge_across_boundaries(self):
+        """Small blocks give the same clusters as one block."""
+        rng = np.random.default_rng(1)
+        lat, lon = rng.uniform(40, 41, 200), rng.uniform(-74, -73, 200)
+        np.testing.assert_array_equal(cluster_locations(lat, lon, radius_km=5, block_size=16),
+                                      cluster_locations(lat, lon, radius_km=5, block_size=1024))
+    
+    def test_ids_in_order_of_first_appearance(self):
+        """Cluster ids are numbered from 0 in the order points first appear."""
+        points = np.array([SYDNEY, LONDON, SYDNEY, PARIS])
+        assert cluster_locations(points[:, 0], points[:, 1], radius_km=1).tolist() == [0, 1, 0, 2]
+    
+    def test_empty(self):
+        """No points, no clusters."""
+        assert len(cluster_locations([], [], radius_km=10)) == 0
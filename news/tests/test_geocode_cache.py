@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Tests for the geocode cache
+
+Name normalization, persistence of coordinates, and reuse of coordinates for
+similarly embedded location names.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from geocode_cache import GeocodeCache, normalize_location
+
+NEW_YORK = {"latitude": 40.7128, "longitude": -74.006}
+PARIS = {"latitude": 48.8566, "longitude": 2.3522}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = GeocodeCache(str(tmp_path / "geocode.sqlite"))
+    yield cache
+    cache.close()
+
+
+class TestCoordinates:
+    """Test exact lookups by location name."""
+    
+    def test_normalize_location(self):
+        """Case and whitespace differences map to one key."""
+        assert normalize_location("  New   York City ") == normalize_location("new york city")
+    
+    def test_round_trip(self, cache):
+        """Stored coordinates are returned under the name they were asked for."""
+        cache.put_many({"New York City": NEW_YORK, "Paris": PARIS})
+        assert cache.get_many(["Paris", "NEW YORK  CITY", "Berlin"]) == {
+            "Paris": PARIS,
+            "NEW YORK  CITY": NEW_YORK,
+        }
+    
+    def test_duplicate_spellings_all_answered(self, cache):
+        """Several spellings of one key in a lookup each get the coordinates."""
+        cache.put_many({"Paris": PARIS})
+        assert cache.get_many(["Paris", "paris"]) == {"Paris": PARIS, "paris": PARIS}
+    
+    def test_persists_across_instances(self, cache):
+        """A new cache on the same database sees earlier entries."""
+        cache.put_many({"Paris": PARIS})
+        other = GeocodeCache(cache.path)
+        assert other.get_many(["Paris"]) == {"Paris": PARIS}
+        other.close()
+    
+    def test_large_lookup(self, cache):
+        """Lookups larger than one SQL chunk are answered in full."""
+        coordinates = {f"Place {i}": {"latitude": i / 100, "longitude": -i / 100} for i in range(1200)}
+        cache.put_many(coordinates)
+        assert cache.get_many(coordinates) == coordinates
+
+
+class TestSimilarity:
+    """Test reuse of coordinates by embedding similarity."""
+    
+    def test_close_name_reuses_coordinates(self, cache):
+        """A name whose embedding is above the threshold gets the stored coordinates."""
+        cache.put_many({"New York City": NEW_YORK, "Paris": PARIS})
+        cache.put_embeddings({"New York City": np.array([1.0, 0.0, 0.0]), "Paris": np.array([0.0, 1.0, 0.0])})
+        
+        found = cache.get_similar_many({"NYC": np.array([0.98, 0.05, 0.0]), "Tokyo": np.array([0.0, 0.0, 1.0])},
+                                       threshold=0.95)
+        assert found == {"NYC": NEW_YORK}
+    
+    def test_vectors_are_normalized(self, cache):
+        """Similarity is cosine, so vector length does not matter."""
+        cache.put_many({"Paris": PARIS})
+        cache.put_embeddings({"Paris": np.array([0.0, 3.0])})
+        assert cache.get_similar_many({"Paris, France": np.array([0.0, 0.5])}, threshold=0.99) == {
+            "Paris, France": PARIS,
+        }
+    
+    def test_embeddings_without_coordinates_ignored(self, cache):
+        """An embedding only takes part once its name has coordinates."""
+        cache.put_embeddings({"Atlantis": np.array([1.0, 0.0])})
+        assert cache.get_similar_many({"Atlantis": np.array([1.0, 0.0])}, threshold=0.9) == {}
+    
+    def test_new_embeddings_picked_up(self, cache):
+        """Embeddings stored after a lookup are used by the next one."""
+        cache.put_many({"Paris": PARIS})
+        assert cache.get_similar_many({"Paris, France": np.array([0.0, 1.0])}, threshold=0.9) == {}
+        cache.put_embeddings({"Paris": np.array([0.0, 1.0])})
+        assert cache.get_similar_many({"Paris, France": np.array([0.0, 1.0])}, threshold=0.9) == {
+            "Paris, France": PARIS,
+        }
+    
+    def test_dimension_mismatch_misses(self, cache):
+        """Embeddings from a different model (other dimensions) never match."""
+        cache.put_many({"Paris": PARIS})
+        cache.put_embeddings({"Paris": np.array([0.0, 1.0])})
+        assert cache.get_similar_many({"Paris": np.array([0.0, 1.0, 0.0])}, threshold=0.5) == {}
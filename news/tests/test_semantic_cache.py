@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Tests for the semantic cache
+
+Lookups by prompt similarity, response lifetimes and namespace isolation, with
+a fake embedder instead of an AI provider.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import semantic_cache
+from semantic_cache import SemanticCache
+
+
+class FakeEmbedder:
+    """Embeds a prompt as a fixed vector picked by a word it contains."""
+    
+    VECTORS = {
+        "weather": [1.0, 0.0, 0.0],
+        "forecast": [0.99, 0.1, 0.0],
+        "stocks": [0.0, 1.0, 0.0],
+    }
+    
+    def __init__(self):
+        self.calls = 0
+    
+    def generate_embedding(self, text):
+        self.calls += 1
+        for word, vector in self.VECTORS.items():
+            if word in text:
+                return np.array(vector, dtype=np.float32)
+        return np.array([0.0, 0.0, 1.0], dtype=np.float32)
+
+
+def prompt(text):
+    return [{"role": "user", "content": text}]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = SemanticCache(FakeEmbedder(), path=str(tmp_path / "semantic.sqlite"), threshold=0.95)
+    yield cache
+    cache.close()
+
+
+class TestLookup:
+    """Test similarity lookups."""
+    
+    def test_similar_prompt_hits(self, cache):
+        """A prompt above the similarity threshold reuses the cached response."""
+        cache.store(prompt("weather today"), "sunny")
+        assert cache.lookup(prompt("forecast today")) == "sunny"
+    
+    def test_dissimilar_prompt_misses(self, cache):
+        """A prompt below the threshold is not served from the cache."""
+        cache.store(prompt("weather today"), "sunny")
+        assert cache.lookup(prompt("stocks today")) is None
+    
+    def test_precomputed_vector_skips_embedding(self, cache):
+        """Passing the vector avoids a second embedding call."""
+        vector = cache.embed(prompt("weather today"))
+        cache.store(prompt("weather today"), "sunny", vector=vector)
+        assert cache.lookup(prompt("weather today"), vector=vector) == "sunny"
+        assert cache.embedder.calls == 1
+    
+    def test_entries_persist(self, cache):
+        """A new cache on the same database sees stored responses."""
+        cache.store(prompt("weather today"), "sunny")
+        other = SemanticCache(FakeEmbedder(), path=cache.path, threshold=0.95)
+        assert other.lookup(prompt("weather today")) == "sunny"
+        other.close()
+
+
+class TestNamespaces:
+    """Test namespace isolation."""
+    
+    def test_namespaces_do_not_share_responses(self, cache):
+        """A response cached under one namespace is not returned under another."""
+        cache.store(prompt("weather today"), "sunny", namespace="gpt-4o")
+        assert cache.lookup(prompt("weather today"), namespace="claude") is None
+        assert cache.lookup(prompt("weather today"), namespace="gpt-4o") == "sunny"
+    
+    def test_same_prompt_in_two_namespaces(self, cache):
+        """Each namespace keeps its own response for the same prompt."""
+        cache.store(prompt("weather today"), "sunny", namespace="a")
+        cache.store(prompt("weather today"), "cloudy", namespace="b")
+        assert cache.lookup(prompt("weather today"), namespace="a") == "sunny"
+        assert cache.lookup(prompt("weather today"), namespace="b") == "cloudy"
+
+
+class TestExpiry:
+    """Test response lifetimes."""
+    
+    @pytest.fixture
+    def clock(self, monkeypatch):
+        """Controllable time.time() for the cache module"""
+        now = [1_000_000.0]
+        monkeypatch.setattr(semantic_cache.time, "time", lambda: now[0])
+        return now
+    
+    def test_expired_response_misses(self, tmp_path, clock):
+        """A response past its TTL is no longer returned."""
+        cache = SemanticCache(FakeEmbedder(), path=str(tmp_path / "semantic.sqlite"),
+                              threshold=0.95, ttl_seconds=60)
+        cache.store(prompt("weather today"), "sunny")
+        
+        clock[0] += 59
+        assert cache.lookup(prompt("weather today")) == "sunny"
+        clock[0] += 2
+        assert cache.lookup(prompt("weather today")) is None
+        cache.close()
+    
+    def test_expired_rows_not_loaded(self, tmp_path, clock):
+        """A cache opened later skips expired rows, and purge_expired deletes them."""
+        path = str(tmp_path / "semantic.sqlite")
+        cache = SemanticCache(FakeEmbedder(), path=path, threshold=0.95, ttl_seconds=60)
+        cache.store(prompt("weather today"), "sunny")
+        cache.close()
+        
+        clock[0] += 120
+        cache = SemanticCache(FakeEmbedder(), path=path, threshold=0.95)
+        cache.store(prompt("stocks today"), "up")
+        assert cache.lookup(prompt("weather today")) is None
+        
+        cache.purge_expired()
+        assert cache.conn.execute("SELECT response FROM responses").fetchall() == [("up",)]
+        assert cache.lookup(prompt("stocks today")) == "up"
+        cache.close()
+    
+    def test_no_ttl_keeps_responses(self, cache, clock):
+        """Without a TTL responses never expire."""
+        cache.store(prompt("weather today"), "sunny")
+        clock[0] += 10 ** 9
+        assert cache.lookup(prompt("weather today")) == "sunny"
@@ -51,7 +51,7 @@ class NewsVectorSearchNeo4j:
             print(f"🔍 Generating embedding for query: '{query_text[:50]}...'")
             query_embedding = self.ai_provider.generate_embedding(query_text)
             
-            if not query_embedding:
+            if query_embedding is None or not len(query_embedding):
                 print("❌ Failed to generate embedding")
                 return []
             
@@ -72,7 +72,7 @@ class NewsVectorSearchNeo4j:
             
             with self.driver.session(database=self.database) as session:
                 result = session.run(search_query, {
-                    'queryVector': query_embedding,
+                    'queryVector': query_embedding.tolist(),
                     'topK': limit * 2,  # Get more candidates to filter by min_score
                     'minScore': min_score,
                     'limit': limit